@@ -0,0 +1,89 @@
+"""Compare building Block Kit payloads per call with prebuilt templates.
+
+Run with `python -m benchmarks.blocks [--iterations N]`.
+"""
+
+import argparse
+from timeit import timeit
+
+from blockkit import Button
+from blockkit import Confirm
+from blockkit import Input
+from blockkit import Message
+from blockkit import Modal
+from blockkit import PlainTextInput
+from blockkit import Section
+
+from transcental.commands.world import WORLD_MESSAGE
+from transcental.views.hello_world import HELLO_WORLD_VIEW
+
+
+def build_hello_world_view(channel_id: str) -> dict:
+    return (
+        Modal()
+        .callback_id("hello_world")
+        .title("Hewwo Wowld")
+        .add_block(Section("wrrf ^-^"))
+        .add_block(
+            Input("Say something ig")
+            .block_id("input")
+            .element(PlainTextInput().placeholder("bark bark").action_id("input"))
+        )
+        .private_metadata(channel_id)
+        .submit("Submit")
+        .build()
+    )
+
+
+def build_world_message(performer: str, text: str) -> dict:
+    return (
+        Message()
+        .add_block(
+            Section(f"<@{performer}> said {text}").accessory(
+                Button("do something")
+                .action_id("hello_world")
+                .style(Button.PRIMARY)
+                .confirm(
+                    Confirm()
+                    .title("you sure?")
+                    .text("you can't undo something ya know")
+                    .confirm("yep!")
+                    .deny("on second thoughts...")
+                )
+            )
+        )
+        .build()
+    )
+
+
+CASES = [
+    (
+        "hello_world view",
+        lambda: build_hello_world_view("C0123456789"),
+        lambda: HELLO_WORLD_VIEW.render(channel_id="C0123456789"),
+    ),
+    (
+        "world message",
+        lambda: build_world_message("U0123456789", "hello there"),
+        lambda: WORLD_MESSAGE.render(performer="U0123456789", text="hello there"),
+    ),
+]
+
+
+def main(iterations: int = 10_000):
+    for name, builder, template in CASES:
+        if builder() != template():
+            raise SystemExit(f"{name}: template output differs from builder output")
+        built = timeit(builder, number=iterations) / iterations * 1e6
+        rendered = timeit(template, number=iterations) / iterations * 1e6
+        print(
+            f"{name:<18} builder {built:8.2f}us  template {rendered:8.2f}us  "
+            f"({built / rendered:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import hashlib
+import hmac
+import os
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator
+from urllib.parse import urlencode
+
+from aiohttp import ClientSession
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(pct) - 1]
+
+
+def summarise(name: str, samples: list[float], unit: str = "ms", scale: float = 1e3):
+    print(
+        f"{name:<28} n={len(samples):<6} "
+        f"p50={percentile(samples, 50) * scale:8.2f}{unit} "
+        f"p99={percentile(samples, 99) * scale:8.2f}{unit} "
+        f"max={max(samples, default=float('nan')) * scale:8.2f}{unit}"
+    )
+
+
+def rss_kib(pid: int) -> int | None:
+    """Resident set size of `pid` in KiB (Linux only)."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def sign(secret: str, body: bytes, timestamp: str | None = None) -> dict[str, str]:
+    timestamp = timestamp or str(int(time.time()))
+    base = f"v0:{timestamp}:".encode() + body
+    signature = "v0=" + hmac.new(secret.encode(), base, hashlib.sha256).hexdigest()
+    return {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": signature,
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+
+
+def slash_command(text: str, user_id: str, response_url: str, trigger_id: str) -> bytes:
+    return urlencode(
+        {
+            "token": "benchmark",
+            "team_id": "TBENCH",
+            "team_domain": "bench",
+            "channel_id": "CBENCH",
+            "channel_name": "bench",
+            "user_id": user_id,
+            "user_name": "bench",
+            "command": "/dev-transcental",
+            "text": text,
+            "api_app_id": "ABENCH",
+            "response_url": response_url,
+            "trigger_id": trigger_id,
+        }
+    ).encode()
+
+
+@contextlib.asynccontextmanager
+async def run_app(
+    slack_url: str, home_assistant_url: str, **env: str
+) -> AsyncIterator[tuple[str, asyncio.subprocess.Process]]:
+    """Run the app under uvicorn in a subprocess, pointed at the stand-ins.
+
+    Yields the app's base URL and the process (for memory sampling).
+    """
+    port = free_port()
+    child_env = {
+        **os.environ,
+        "ENVIRONMENT": "development",
+        "SLACK__APP_TOKEN": "",
+        "SLACK__HEARTBEAT_CHANNEL": "",
+        "SLACK__API_URL": f"http://{slack_url}/api/",
+        "HOME_ASSISTANT__URL": home_assistant_url,
+        "AUDIT__ENABLED": "false",  # there's no database to write to
+        **env,
+    }
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "transcental.utils.starlette:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        "--loop",
+        "uvloop",
+        cwd=ROOT,
+        env=child_env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        async with ClientSession() as session:
+            for _ in range(200):
+                with contextlib.suppress(OSError):
+                    async with session.get(f"{base}/health") as resp:
+                        if resp.status == 200:
+                            break
+                await asyncio.sleep(0.05)
+            else:
+                raise RuntimeError("app did not start")
+        yield base, proc
+    finally:
+        proc.terminate()
+        try:
+            await asyncio.wait_for(proc.wait(), 10)
+        except TimeoutError:
+            proc.kill()
+            await proc.wait()
@@ -0,0 +1,391 @@
+"""A Home Assistant simulator speaking enough REST and websocket API for the app.
+
+Serves `get_states`, `subscribe_events`/`unsubscribe_events`, `call_service`
+(REST and websocket), `ping` and `get_config` over thousands of fake
+entities. It can generate background `state_changed` traffic at a given rate,
+add latency to every reply, and drop every websocket connection on a
+schedule (optionally staying down for a while, like a restart).
+
+Run standalone and point HOME_ASSISTANT__URL at it:
+
+    python -m benchmarks.home_assistant --port 8123 --entities 5000 --rate 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+
+from aiohttp import web
+from aiohttp import WSMsgType
+
+from benchmarks.stubs import StubServer
+
+HA_VERSION = "2025.1.0"
+CONTEXT = {"id": "simulator", "parent_id": None, "user_id": None}
+
+
+@dataclass
+class SimulatorOptions:
+    token: str = ""  # empty accepts any token
+    entities: int = 1000
+    rate: float = 0.0  # background state_changed events per second
+    latency: float = 0.0  # seconds added to every reply
+    jitter: float = 0.0  # up to this many extra seconds, uniformly
+    disconnect_every: float = 0.0  # seconds between dropping all websockets
+    downtime: float = 0.0  # seconds to refuse connections after a drop
+    seed: int | None = None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _state(entity_id: str, state: str, attributes: dict[str, Any]) -> dict:
+    now = _now()
+    return {
+        "entity_id": entity_id,
+        "state": state,
+        "attributes": attributes,
+        "last_changed": now,
+        "last_updated": now,
+        "last_reported": now,
+        "context": CONTEXT,
+    }
+
+
+def _initial_states(count: int, rng: random.Random) -> dict[str, dict]:
+    states = {
+        "light.bedroom": _state(
+            "light.bedroom",
+            "on",
+            {"rgb_color": [255, 255, 255], "brightness": 255, "color_temp": 4000},
+        )
+    }
+    domains = ("light", "switch", "sensor", "binary_sensor")
+    for i in range(count - 1):
+        domain = domains[i % len(domains)]
+        entity_id = f"{domain}.sim_{i}"
+        match domain:
+            case "light":
+                state = _state(entity_id, "off", {"brightness": 0})
+            case "sensor":
+                state = _state(
+                    entity_id,
+                    f"{rng.uniform(15, 25):.1f}",
+                    {"unit_of_measurement": "°C"},
+                )
+            case _:
+                state = _state(entity_id, rng.choice(("on", "off")), {})
+        states[entity_id] = state
+    return states
+
+
+def apply_service(
+    state: dict, domain: str, service: str, data: dict[str, Any]
+) -> tuple[str, dict[str, Any]]:
+    """Roughly what Home Assistant would do to an entity for a service call."""
+    current = state["state"]
+    attributes = dict(state["attributes"])
+    match service:
+        case "turn_off":
+            return "off", attributes
+        case "toggle":
+            return ("off" if current == "on" else "on"), attributes
+        case "turn_on":
+            if domain == "light":
+                if "brightness_pct" in data:
+                    attributes["brightness"] = round(
+                        float(data["brightness_pct"]) * 2.55
+                    )
+                if "brightness" in data:
+                    attributes["brightness"] = int(data["brightness"])
+                for key in ("rgb_color", "rgbw_color", "rgbww_color"):
+                    if key in data:
+                        attributes["rgb_color"] = list(data[key])[:3]
+                if "kelvin" in data:
+                    attributes["color_temp"] = int(data["kelvin"])
+                if "color_temp" in data:
+                    attributes["color_temp"] = int(data["color_temp"])
+            return "on", attributes
+    return current, attributes
+
+
+class HomeAssistantSimulator(StubServer):
+    def __init__(self, options: SimulatorOptions | None = None):
+        super().__init__()
+        self.options = options or SimulatorOptions()
+        self.rng = random.Random(self.options.seed)
+        self.states = _initial_states(max(1, self.options.entities), self.rng)
+        self._entity_ids = list(self.states)
+        # (socket, subscription id, event_type or None for all events)
+        self.subscriptions: list[tuple[web.WebSocketResponse, int, str | None]] = []
+        self.sockets: set[web.WebSocketResponse] = set()
+        self.subscribed = asyncio.Event()
+        self.down = False
+        self.stats = {"events": 0, "service_calls": 0, "connections": 0, "drops": 0}
+        self._tasks: list[asyncio.Task] = []
+
+        self.app.router.add_get("/api/", self.api_root)
+        self.app.router.add_get("/api/config", self.api_config)
+        self.app.router.add_get("/api/states", self.api_states)
+        self.app.router.add_get("/api/states/{entity_id}", self.api_state)
+        self.app.router.add_post("/api/services/{domain}/{service}", self.api_service)
+        self.app.router.add_get("/api/websocket", self.websocket)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        url = await super().start(host, port)
+        if self.options.rate > 0:
+            self._tasks.append(asyncio.create_task(self._generate()))
+        if self.options.disconnect_every > 0:
+            self._tasks.append(asyncio.create_task(self._disconnect_loop()))
+        return url
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for ws in list(self.sockets):
+            await ws.close()
+        await super().stop()
+
+    async def _delay(self):
+        delay = self.options.latency
+        if self.options.jitter:
+            delay += self.rng.uniform(0, self.options.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _authorised(self, token: str | None) -> bool:
+        return not self.options.token or token == self.options.token
+
+    # -- state ---------------------------------------------------------------
+
+    async def set_state(self, entity_id: str, state: str, attributes: dict[str, Any]):
+        old = self.states.get(entity_id)
+        new = _state(entity_id, state, attributes)
+        self.states[entity_id] = new
+        if old is None:
+            self._entity_ids.append(entity_id)
+        await self.fire(
+            "state_changed",
+            {"entity_id": entity_id, "old_state": old, "new_state": new},
+        )
+
+    async def fire(self, event_type: str, data: dict[str, Any]):
+        self.stats["events"] += 1
+        event = {
+            "event_type": event_type,
+            "data": data,
+            "origin": "LOCAL",
+            "time_fired": _now(),
+            "context": CONTEXT,
+        }
+        for ws, sub_id, wanted in list(self.subscriptions):
+            if wanted not in (None, event_type) or ws.closed:
+                continue
+            try:
+                await ws.send_str(
+                    json.dumps({"id": sub_id, "type": "event", "event": event})
+                )
+            except ConnectionError:
+                pass
+
+    async def call_service(self, domain: str, service: str, data: dict[str, Any]):
+        self.stats["service_calls"] += 1
+        entity_ids = data.pop("entity_id", None) or []
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        for entity_id in entity_ids:
+            if entity_id in self.states:
+                state, attributes = apply_service(
+                    self.states[entity_id], domain, service, data
+                )
+                await self.set_state(entity_id, state, attributes)
+
+    async def _generate(self):
+        tick = 0.01
+        budget = 0.0
+        while True:
+            await asyncio.sleep(tick)
+            budget += self.options.rate * tick
+            while budget >= 1:
+                budget -= 1
+                entity_id = self.rng.choice(self._entity_ids)
+                current = self.states[entity_id]
+                if entity_id.startswith("sensor."):
+                    state = (
+                        f"{float(current['state']) + self.rng.uniform(-0.5, 0.5):.1f}"
+                    )
+                else:
+                    state = "off" if current["state"] == "on" else "on"
+                await self.set_state(entity_id, state, current["attributes"])
+
+    async def _disconnect_loop(self):
+        while True:
+            await asyncio.sleep(self.options.disconnect_every)
+            self.stats["drops"] += 1
+            self.down = self.options.downtime > 0
+            for ws in list(self.sockets):
+                await ws.close()
+            if self.down:
+                await asyncio.sleep(self.options.downtime)
+                self.down = False
+
+    # -- REST ----------------------------------------------------------------
+
+    async def _rest(self, req: web.Request, body: Any) -> web.Response:
+        if self.down:
+            return web.json_response({"message": "starting"}, status=503)
+        auth = req.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not self._authorised(auth):
+            return web.json_response({"message": "unauthorized"}, status=401)
+        await self._delay()
+        if body is None:
+            return web.json_response({"message": "Entity not found."}, status=404)
+        return web.json_response(body)
+
+    async def api_root(self, req: web.Request) -> web.Response:
+        return await self._rest(req, {"message": "API running."})
+
+    async def api_config(self, req: web.Request) -> web.Response:
+        return await self._rest(req, {"version": HA_VERSION, "state": "RUNNING"})
+
+    async def api_states(self, req: web.Request) -> web.Response:
+        return await self._rest(req, list(self.states.values()))
+
+    async def api_state(self, req: web.Request) -> web.Response:
+        return await self._rest(req, self.states.get(req.match_info["entity_id"]))
+
+    async def api_service(self, req: web.Request) -> web.Response:
+        data = await req.json() if req.can_read_body else {}
+        if not self.down:
+            await self.call_service(
+                req.match_info["domain"], req.match_info["service"], data
+            )
+        return await self._rest(req, [])
+
+    # -- websocket -----------------------------------------------------------
+
+    async def websocket(self, req: web.Request) -> web.StreamResponse:
+        if self.down:
+            return web.Response(status=503)
+        ws = web.WebSocketResponse(heartbeat=None)
+        await ws.prepare(req)
+        self.stats["connections"] += 1
+        self.sockets.add(ws)
+        try:
+            await ws.send_json({"type": "auth_required", "ha_version": HA_VERSION})
+            msg = await ws.receive()
+            data = json.loads(msg.data) if msg.type == WSMsgType.TEXT else {}
+            if data.get("type") != "auth" or not self._authorised(
+                data.get("access_token")
+            ):
+                await ws.send_json(
+                    {"type": "auth_invalid", "message": "Invalid access token"}
+                )
+                return ws
+            await ws.send_json({"type": "auth_ok", "ha_version": HA_VERSION})
+
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    break
+                await self._command(ws, json.loads(msg.data))
+        finally:
+            self.sockets.discard(ws)
+            self.subscriptions = [s for s in self.subscriptions if s[0] is not ws]
+        return ws
+
+    async def _command(self, ws: web.WebSocketResponse, data: dict[str, Any]):
+        msg_id = data.get("id")
+        await self._delay()
+        result: Any = None
+        match data.get("type"):
+            case "ping":
+                await ws.send_json({"id": msg_id, "type": "pong"})
+                return
+            case "get_states":
+                result = list(self.states.values())
+            case "get_config":
+                result = {"version": HA_VERSION, "state": "RUNNING"}
+            case "subscribe_events":
+                self.subscriptions.append((ws, msg_id, data.get("event_type")))
+                self.subscribed.set()
+            case "unsubscribe_events":
+                self.subscriptions = [
+                    s
+                    for s in self.subscriptions
+                    if not (s[0] is ws and s[1] == data.get("subscription"))
+                ]
+            case "call_service":
+                service_data = dict(data.get("service_data") or {})
+                target = data.get("target") or {}
+                if "entity_id" in target:
+                    service_data["entity_id"] = target["entity_id"]
+                await self.call_service(data["domain"], data["service"], service_data)
+                result = {"context": CONTEXT, "response": None}
+            case "supported_features":
+                pass
+            case _:
+                await ws.send_json(
+                    {
+                        "id": msg_id,
+                        "type": "result",
+                        "success": False,
+                        "error": {
+                            "code": "unknown_command",
+                            "message": "Unknown command.",
+                            "translation_key": "",
+                            "translation_placeholders": {},
+                            "translation_domain": "",
+                        },
+                    }
+                )
+                return
+        await ws.send_json(
+            {"id": msg_id, "type": "result", "success": True, "result": result}
+        )
+
+
+async def main(host: str, port: int, options: SimulatorOptions):
+    simulator = HomeAssistantSimulator(options)
+    url = await simulator.start(host, port)
+    print(f"Simulating {len(simulator.states)} entities on http://{url}/api")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(simulator.stats)
+    finally:
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--token", default="")
+    parser.add_argument("--entities", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=0.0, help="events per second")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="seconds")
+    parser.add_argument("--downtime", type=float, default=0.0, help="seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    options = SimulatorOptions(
+        token=args.token,
+        entities=args.entities,
+        rate=args.rate,
+        latency=args.latency,
+        jitter=args.jitter,
+        disconnect_every=args.disconnect_every,
+        downtime=args.downtime,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(main(args.host, args.port, options))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,135 @@
+"""Replay signed slash commands against /slack/events.
+
+Reports ack latency (time to the HTTP 200), dispatch latency and throughput
+(time until the handler's `respond()` reaches the Slack stand-in) and
+end-to-end latency from the command to the resulting /ws push.
+
+Run with `python -m benchmarks.slack [--requests N] [--concurrency C]`.
+"""
+
+import argparse
+import asyncio
+import os
+from time import perf_counter
+
+from aiohttp import ClientSession
+
+from benchmarks.harness import run_app
+from benchmarks.harness import sign
+from benchmarks.harness import slash_command
+from benchmarks.harness import summarise
+from benchmarks.home_assistant import HomeAssistantSimulator
+from benchmarks.home_assistant import SimulatorOptions
+from benchmarks.stubs import SlackStub
+
+USER = "UBENCH"
+SECRET = os.environ["SLACK__SIGNING_SECRET"]
+
+
+async def send(
+    session: ClientSession, base: str, slack_url: str, text: str, request_id: str
+) -> float:
+    body = slash_command(
+        text, USER, f"http://{slack_url}/respond/{request_id}", f"{request_id}.trigger"
+    )
+    start = perf_counter()
+    async with session.post(
+        f"{base}/slack/events", data=body, headers=sign(SECRET, body)
+    ) as resp:
+        await resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"command {request_id} failed with {resp.status}")
+    return start
+
+
+async def ack_and_dispatch(
+    session: ClientSession, base: str, slack: SlackStub, requests: int, concurrency: int
+):
+    sent: dict[str, float] = {}
+    acks: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            request_id = f"r{i}"
+            start = await send(
+                session,
+                base,
+                slack.url,
+                f"ha light.bedroom brightness {i % 100}",
+                request_id,
+            )
+            acks.append(perf_counter() - start)
+            sent[request_id] = start
+
+    started = perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    acked = perf_counter()
+
+    dispatch: list[float] = []
+    finished = acked
+    while len(dispatch) < requests:
+        request_id, at, _ = await asyncio.wait_for(slack.responses.get(), 30)
+        if request_id in sent:
+            dispatch.append(at - sent[request_id])
+            finished = max(finished, at)
+
+    summarise("ack latency", acks)
+    summarise("dispatch latency", dispatch)
+    print(f"{'ack throughput':<28} {requests / (acked - started):10.1f} cmd/s")
+    print(f"{'dispatch throughput':<28} {requests / (finished - started):10.1f} cmd/s")
+
+
+async def receive_state(ws) -> dict:
+    while "light" not in (data := await ws.receive_json()):
+        pass  # heartbeat pings
+    return data
+
+
+async def end_to_end(session: ClientSession, base: str, slack: SlackStub, rounds: int):
+    samples: list[float] = []
+    async with session.ws_connect(f"{base.replace('http', 'ws', 1)}/ws") as ws:
+        await receive_state(ws)
+        for i in range(rounds):
+            start = await send(
+                session,
+                base,
+                slack.url,
+                f"ha light.bedroom brightness {i % 100}",
+                f"e{i}",
+            )
+            await asyncio.wait_for(receive_state(ws), 10)
+            samples.append(perf_counter() - start)
+    summarise("command -> /ws push", samples)
+
+
+async def main(requests: int, concurrency: int, rounds: int, options: SimulatorOptions):
+    slack = SlackStub(members=[USER])
+    home = HomeAssistantSimulator(options)
+    slack_url = await slack.start()
+    ha_url = await home.start()
+    try:
+        async with run_app(slack_url, ha_url) as (base, _), ClientSession() as session:
+            await asyncio.wait_for(home.subscribed.wait(), 10)
+            # warm up Bolt's auth.test and connection pools
+            for i in range(5):
+                await send(session, base, slack_url, "ha light.bedroom on", f"w{i}")
+                await slack.responses.get()
+            await ack_and_dispatch(session, base, slack, requests, concurrency)
+            await end_to_end(session, base, slack, rounds)
+            print(f"{'slack api calls':<28} {slack.calls}")
+    finally:
+        await slack.stop()
+        await home.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--entities", type=int, default=1)
+    parser.add_argument("--ha-latency", type=float, default=0.0, help="seconds")
+    args = parser.parse_args()
+    options = SimulatorOptions(entities=args.entities, latency=args.ha_latency)
+    asyncio.run(main(args.requests, args.concurrency, args.rounds, options))
@@ -0,0 +1,67 @@
+"""A local stand-in for the Slack Web API.
+
+It answers just enough for the app's hot paths to run end to end, and exposes
+hooks so benchmarks can time when a request reached it. Home Assistant is
+simulated in `benchmarks.home_assistant`.
+"""
+
+import asyncio
+from time import perf_counter
+from typing import Any
+
+from aiohttp import web
+
+
+class StubServer:
+    def __init__(self):
+        self.app = web.Application()
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        host, port = site._server.sockets[0].getsockname()[:2]  # type: ignore[union-attr]
+        self.url = f"{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+
+class SlackStub(StubServer):
+    """Slack Web API plus a `response_url` sink.
+
+    Every `respond()` the app makes lands in `responses` as
+    `(request_id, perf_counter(), payload)`.
+    """
+
+    def __init__(self, members: list[str]):
+        super().__init__()
+        self.members = members
+        self.calls: dict[str, int] = {}
+        self.responses: asyncio.Queue = asyncio.Queue()
+        self.app.router.add_route("*", "/api/{method}", self.api)
+        self.app.router.add_post("/respond/{request_id}", self.respond)
+
+    async def api(self, req: web.Request) -> web.Response:
+        method = req.match_info["method"]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        body: dict[str, Any] = {"ok": True}
+        match method:
+            case "auth.test":
+                body |= {"user_id": "UBOT", "bot_id": "BBOT", "team_id": "TBENCH"}
+            case "conversations.members":
+                body |= {"members": self.members}
+            case "chat.postMessage":
+                body |= {"ts": f"{perf_counter():.6f}", "channel": "CBENCH"}
+        return web.json_response(body)
+
+    async def respond(self, req: web.Request) -> web.Response:
+        self.responses.put_nowait(
+            (req.match_info["request_id"], perf_counter(), await req.json())
+        )
+        return web.Response(text="ok")
@@ -0,0 +1,72 @@
+"""Compare shlex + per-token regexes with the compiled slash-command tokenizer.
+
+The "shlex" column is the previous parsing path: `shlex.split`, string
+patterns matched per token for mentions, channels and mailto links, and
+`unicode_escape` over the trailing string. Both paths are checked to produce
+the same words and ids before timing.
+
+Run with `python -m benchmarks.tokenizer [--iterations N]`.
+"""
+
+import argparse
+import codecs
+import re
+import shlex
+from timeit import timeit
+
+from transcental.utils.tokenizer import tokenize
+
+CASES = [
+    ("plain", "ha light.bedroom on"),
+    ("value", "ha light.bedroom brightness 40"),
+    ("quoted", 'ha light.bedroom colour "rgb(255, 0, 0)"'),
+    ("mention", "song <@U0123456789|amber> <#C0123456789|general>"),
+    ("mailto", "song <mailto:amber@hackclub.com|amber@hackclub.com> hello"),
+    (
+        "raw json",
+        'ha light.bedroom raw turn_on \'{"rgb_color": [255, 0, 0], "transition": 2}\'',
+    ),
+    ("escapes", 'song hello\\\\nworld it\\\'s "a \\"quoted\\" song"'),
+]
+
+
+def shlex_path(text: str) -> list[str | None]:
+    tokens = shlex.split(text, posix=True)
+    out: list[str | None] = []
+    for token in tokens:
+        if m := re.match(r"^<@([UW][A-Z0-9]+)(?:\|[^>]+)?>$", token):
+            out.append(m.group(1))
+        elif m := re.match(r"^<#([CG][A-Z0-9]+)(?:\|[^>]+)?>$", token):
+            out.append(m.group(1))
+        elif m := re.match(r"^<mailto:([^|>]+)(?:\|[^>]+)?>$", token, re.I):
+            out.append(m.group(1).strip())
+        else:
+            out.append(token)
+    try:
+        codecs.decode(" ".join(tokens[2:]), "unicode_escape")
+    except Exception:
+        pass
+    return out
+
+
+def tokenizer_path(text: str) -> list[str | None]:
+    return [token.value or token.text for token in tokenize(text)]
+
+
+def main(iterations: int = 20_000):
+    for name, text in CASES:
+        if shlex_path(text) != tokenizer_path(text):
+            raise SystemExit(f"{name}: tokenizer output differs from shlex")
+        before = timeit(lambda: shlex_path(text), number=iterations) / iterations
+        after = timeit(lambda: tokenizer_path(text), number=iterations) / iterations
+        print(
+            f"{name:<10} shlex {before * 1e6:8.2f}us  tokenizer {after * 1e6:8.2f}us  "
+            f"({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.iterations)
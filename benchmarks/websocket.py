@@ -0,0 +1,139 @@
+"""Fan bursts of Home Assistant state_changed events out to many /ws clients.
+
+Each event carries an increasing `color_temp`, which the app passes through as
+`temperature`, so a client has caught up with event N once it has seen a
+temperature >= N. That keeps latency honest even though slow subscribers only
+get the latest state rather than every intermediate one.
+
+Reports event -> client latency, delivered/fired ratio and server memory per
+subscriber. `--entities` and `--background-rate` add unrelated Home Assistant
+traffic the app has to filter; `--disconnect-every` drops the app's Home
+Assistant connection to exercise reconnects.
+
+Run with `python -m benchmarks.websocket [--clients N] ...`.
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from aiohttp import ClientSession
+from aiohttp import ClientWebSocketResponse
+
+from benchmarks.harness import rss_kib
+from benchmarks.harness import run_app
+from benchmarks.harness import summarise
+from benchmarks.home_assistant import HomeAssistantSimulator
+from benchmarks.home_assistant import SimulatorOptions
+from benchmarks.stubs import SlackStub
+
+ENTITY = "light.bedroom"
+ATTRIBUTES = {"rgb_color": [255, 255, 255], "brightness": 255}
+
+
+async def listen(ws: ClientWebSocketResponse, seen: list[tuple[float, int]]):
+    async for msg in ws:
+        data = msg.json()
+        if "light" in data:
+            seen.append((perf_counter(), data["light"]["temperature"]))
+
+
+def latencies(fired: dict[int, float], seen: list[tuple[float, int]]) -> list[float]:
+    samples = []
+    pending = sorted(fired)
+    i = 0
+    for at, temperature in seen:
+        while i < len(pending) and pending[i] <= temperature:
+            samples.append(at - fired[pending[i]])
+            i += 1
+    return samples
+
+
+async def main(
+    clients: int, bursts: int, burst_size: int, pause: float, options: SimulatorOptions
+):
+    slack = SlackStub(members=[])
+    home = HomeAssistantSimulator(options)
+    slack_url = await slack.start()
+    ha_url = await home.start()
+    try:
+        async with (
+            run_app(slack_url, ha_url) as (base, proc),
+            ClientSession() as session,
+        ):
+            await asyncio.wait_for(home.subscribed.wait(), 10)
+            baseline = rss_kib(proc.pid)
+
+            sockets = []
+            seen: list[list[tuple[float, int]]] = []
+            for _ in range(clients):
+                ws = await session.ws_connect(f"{base.replace('http', 'ws', 1)}/ws")
+                await ws.receive_json()
+                sockets.append(ws)
+                seen.append([])
+            connected = rss_kib(proc.pid)
+            readers = [
+                asyncio.create_task(listen(ws, s)) for ws, s in zip(sockets, seen)
+            ]
+
+            fired: dict[int, float] = {}
+            seq = 10_000  # well above any real colour temperature
+            started = perf_counter()
+            for _ in range(bursts):
+                for _ in range(burst_size):
+                    seq += 1
+                    fired[seq] = perf_counter()
+                    await home.set_state(ENTITY, "on", ATTRIBUTES | {"color_temp": seq})
+                await asyncio.sleep(pause)
+
+            deadline = perf_counter() + 10
+            while perf_counter() < deadline and any(
+                not s or s[-1][1] < seq for s in seen
+            ):
+                await asyncio.sleep(0.05)
+            elapsed = perf_counter() - started
+
+            for ws in sockets:
+                await ws.close()
+            for reader in readers:
+                reader.cancel()
+
+            caught_up = sum(1 for s in seen if s and s[-1][1] >= seq)
+            samples = [x for s in seen for x in latencies(fired, s)]
+            delivered = sum(len(s) for s in seen)
+            summarise("event -> client latency", samples)
+            print(
+                f"{'delivered / fired':<28} {delivered}/{len(fired) * clients} "
+                f"({delivered / (len(fired) * clients):.1%}, latest-state coalescing)"
+            )
+            print(f"{'clients caught up':<28} {caught_up}/{clients}")
+            print(f"{'events/s fired':<28} {len(fired) / elapsed:10.1f}")
+            print(f"{'simulator':<28} {home.stats}")
+            if baseline is not None and connected is not None:
+                print(
+                    f"{'server memory/subscriber':<28} "
+                    f"{(connected - baseline) / clients:10.1f} KiB"
+                )
+    finally:
+        await slack.stop()
+        await home.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--bursts", type=int, default=10)
+    parser.add_argument("--burst-size", type=int, default=50)
+    parser.add_argument("--pause", type=float, default=0.2)
+    parser.add_argument("--entities", type=int, default=1)
+    parser.add_argument("--background-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-every", type=float, default=0.0)
+    parser.add_argument("--downtime", type=float, default=0.0)
+    args = parser.parse_args()
+    options = SimulatorOptions(
+        entities=args.entities,
+        rate=args.background_rate,
+        disconnect_every=args.disconnect_every,
+        downtime=args.downtime,
+    )
+    asyncio.run(main(args.clients, args.bursts, args.burst_size, args.pause, options))
@@ -3,6 +3,8 @@ from piccolo.engine.postgres import PostgresEngine
 
 from transcental.config import config
 
-DB = PostgresEngine(config={"dsn": config.database_url.encoded_string()})
+# No extensions: we don't use UUID columns, and creating one means connecting
+# as soon as the engine is built.
+DB = PostgresEngine(config={"dsn": config.database_url.encoded_string()}, extensions=())
 
 APP_REGISTRY = AppRegistry(apps=["transcental.piccolo_app"])
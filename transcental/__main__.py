@@ -1,9 +1,9 @@
 import asyncio
-import logging
 
 import uvicorn
 
 from transcental.config import config
+from transcental.utils.logging import configure_logging
 
 try:
     import uvloop
@@ -12,7 +12,7 @@ try:
 except ImportError:
     pass
 
-logging.basicConfig(level="DEBUG" if config.environment != "production" else "INFO")
+configure_logging()
 
 
 def start():
@@ -21,7 +21,9 @@ def start():
         host="0.0.0.0",
         port=config.port,
         log_level="info" if config.environment != "production" else "warning",
-        reload=config.environment == "development",
+        reload=config.environment == "development" and config.workers == 1,
+        workers=config.workers,
+        timeout_graceful_shutdown=config.shutdown.timeout,
     )
 
 
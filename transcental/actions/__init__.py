@@ -1,6 +1,7 @@
 from slack_bolt.async_app import AsyncApp
 
 from transcental.actions.hello_world import hello_world_handler
+from transcental.utils.shutdown import inflight
 
 
 ACTIONS = [
@@ -13,4 +14,4 @@ ACTIONS = [
 
 def register_actions(app: AsyncApp):
     for action in ACTIONS:
-        app.action(action["id"])(action["handler"])
+        app.action(action["id"])(inflight.track(action["handler"]))
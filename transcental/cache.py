@@ -1,12 +1,45 @@
 from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from transcental.config import config
+
+# what the website shows until Home Assistant has told us otherwise
+DEFAULT_LIGHT = {
+    "colour": "rgb(255,255,255)",
+    "on": True,
+    "brightness": 100,
+    "temperature": 4000,
+}
 
 
 @dataclass
 class Cache:
-    light_colour: str = "rgb(255,255,255)"
-    light_brightness: int = 100
-    light_temperature: int = 4000
-    light_on: bool = True
+    # entity id -> compact state, as encoded by the entity's domain handler
+    states: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # unix time Home Assistant went away, None while the feed is live
+    stale_since: float | None = None
+    # bumped by the bus leader on every change; see Environment.publish_state
+    version: int = 0
+
+    def snapshot(self, public: bool = False) -> dict[str, Any]:
+        """Everything, as carried on the bus, or with `public` only what the
+        website and unauthenticated clients may see."""
+        states = self.states
+        if public:
+            shown = config.home_assistant.shown
+            states = {k: v for k, v in states.items() if k in shown}
+        return {
+            "version": self.version,
+            "light": self.states.get(config.home_assistant.light, DEFAULT_LIGHT),
+            "entities": dict(states),
+            "status": {"stale_since": self.stale_since},
+        }
+
+    def load(self, snapshot: dict[str, Any]):
+        self.states = dict(snapshot.get("entities", {}))
+        self.stale_since = snapshot.get("status", {}).get("stale_since")
+        self.version = snapshot.get("version", self.version)
 
 
 cache = Cache()
@@ -1,7 +1,6 @@
-import codecs
 import logging
 import re
-import shlex
+from time import perf_counter
 from typing import Any
 
 from slack_bolt.async_app import AsyncAck
@@ -11,8 +10,21 @@ from slack_sdk.errors import SlackApiError
 from slack_sdk.web.async_client import AsyncWebClient
 
 from transcental.commands.ha import home_assistant_handler
+from transcental.commands.loop import loop_handler
+from transcental.commands.reload import reload_handler
 from transcental.commands.world import world_handler
 from transcental.config import config
+from transcental.domains import action_names
+from transcental.utils.shutdown import inflight
+from transcental.utils.tokenizer import CHANNEL_ID_RE
+from transcental.utils.tokenizer import classify
+from transcental.utils.tokenizer import decode_escapes
+from transcental.utils.tokenizer import Token
+from transcental.utils.tokenizer import tokenize
+from transcental.utils.tokenizer import USER_ID_RE
+from transcental.utils.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 PREFIX = "transcental"  # the main command!
 
@@ -30,6 +42,20 @@ COMMANDS = [
             },
         ],
     },
+    {
+        "name": "loop",
+        "description": "event loop lag, task counts and the latest stall",
+        "function": loop_handler,
+        "admin": True,
+        "parameters": [],
+    },
+    {
+        "name": "reload",
+        "description": "re-read .env and apply the settings that can change live",
+        "function": reload_handler,
+        "admin": True,
+        "parameters": [],
+    },
     {
         "name": "ha",
         "description": "control home assistant devices",
@@ -44,16 +70,8 @@ COMMANDS = [
             {
                 "name": "action",
                 "type": "choice",
-                "description": "the action to perform",
-                "choices": [
-                    "on",
-                    "off",
-                    "toggle",
-                    "temperature",
-                    "colour",
-                    "brightness",
-                    "raw",
-                ],
+                "description": "the action to perform (which ones apply depends on the entity)",
+                "choices": action_names(),
                 "required": True,
             },
             {
@@ -81,12 +99,12 @@ def _normalize_user_token(token: str) -> str | None:
         return None
 
     # Match <@U123ABC|name> or <@U123ABC>
-    m = re.match(r"^<@([UW][A-Z0-9]+)(?:\|[^>]+)?>$", token)
-    if m:
-        return m.group(1)
+    parsed = classify(token)
+    if parsed.kind == "user":
+        return parsed.value
 
     # Plain id like U123ABC or W123ABC
-    if re.match(r"^[UW][A-Z0-9]+$", token):
+    if USER_ID_RE.fullmatch(token):
         return token
 
     return None
@@ -103,11 +121,11 @@ def _normalize_channel_token(token: str) -> str | None:
     if not isinstance(token, str):
         return None
 
-    m = re.match(r"^<#([CG][A-Z0-9]+)(?:\|[^>]+)?>$", token)
-    if m:
-        return m.group(1)
+    parsed = classify(token)
+    if parsed.kind == "channel":
+        return parsed.value
 
-    if re.match(r"^[CG][A-Z0-9]+$", token):
+    if CHANNEL_ID_RE.fullmatch(token):
         return token
 
     return None
@@ -124,9 +142,9 @@ def _extract_mailto(token: str) -> str | None:
     if not isinstance(token, str):
         return None
 
-    m = re.match(r"^<mailto:([^|>]+)(?:\|[^>]+)?>$", token, re.I)
-    if m:
-        return m.group(1).strip()
+    parsed = classify(token)
+    if parsed.kind == "mailto":
+        return parsed.value
 
     return None
 
@@ -186,20 +204,32 @@ def register_commands(app: AsyncApp):
             help += f"- `{COMMAND_PREFIX} {cmd['name']}{f' {params}' if params else ''}`: {cmd['description']}\n"
 
     @app.command(COMMAND_PREFIX)
+    @inflight.track
+    @traced("slash_command")
     async def main_command(
         ack: AsyncAck, client: AsyncWebClient, respond: AsyncRespond, command: dict
     ):
+        from transcental.env import env
+
+        started = perf_counter()
         await ack()
         user_id = command.get("user_id")
         raw_text = command.get("text", "")
 
+        limits = config.limits
+        if len(raw_text) > limits.text_length:
+            await respond(
+                f"Command text is too long ({len(raw_text)} characters, "
+                f"the limit is {limits.text_length})."
+            )
+            return
         try:
-            tokens = shlex.split(raw_text, posix=True) if raw_text else []
+            tokens = tokenize(raw_text, limits.tokens) if raw_text else []
         except ValueError as e:
             await respond(f"Could not parse command text: {e}")
             return
 
-        command_name = tokens[0] if tokens else ""
+        command_name = tokens[0].text if tokens else ""
         for cmd in COMMANDS:
             if cmd["name"] != command_name:
                 continue
@@ -211,10 +241,12 @@ def register_commands(app: AsyncApp):
             parsed = tokens[1:]
             params = cmd.get("parameters", []) or []
             args_tokens = parsed
-            logging.debug(
-                f"Command '{command_name}' invoked by user '{user_id}' with raw text: {raw_text}"
+            logger.debug(
+                "Command %s invoked by %s",
+                command_name,
+                user_id,
+                extra={"command": command_name, "user": user_id, "tokens": len(tokens)},
             )
-            logging.debug(f"Parsed tokens: {tokens}")
 
             # If the last declared parameter is a 'string', join the remainder into one argument.
             if params and params[-1].get("type") == "string":
@@ -222,15 +254,15 @@ def register_commands(app: AsyncApp):
                 first_parts = args_tokens[:num_non_string]
                 remaining = args_tokens[num_non_string:]
                 last_string = (
-                    " ".join(remaining) if remaining else params[-1].get("default", "")
+                    " ".join(t.text for t in remaining)
+                    if remaining
+                    else params[-1].get("default", "")
                 )
-                try:
-                    last_string = codecs.decode(last_string, "unicode_escape")
-                except Exception:
-                    pass
-                args_tokens = first_parts + [last_string]
-                logging.debug(
-                    f"Adjusted args tokens for trailing string parameter: {args_tokens}"
+                # escapes are decoded once, with the other string parameters below
+                args_tokens = first_parts + [Token(last_string)]
+                logger.debug(
+                    "Joined %d trailing tokens into the last string parameter",
+                    len(remaining),
                 )
 
             import inspect
@@ -252,16 +284,8 @@ def register_commands(app: AsyncApp):
                 ptype = param.get("type", "string")
                 default = param.get("default", None)
 
-                logging.debug(
-                    f"Processing parameter '{pname}' of type '{ptype}' at position {idx}"
-                )
-
-                if idx < len(args_tokens):
-                    raw_val = args_tokens[idx]
-                else:
-                    raw_val = default
-
-                logging.debug(f"Raw value for parameter '{pname}': {raw_val}")
+                token = args_tokens[idx] if idx < len(args_tokens) else None
+                raw_val = token.text if token is not None else default
 
                 # Normalize missing values
                 if raw_val is None or raw_val == "":
@@ -282,16 +306,21 @@ def register_commands(app: AsyncApp):
                         if isinstance(raw_val, str):
                             raw_val_str = raw_val.strip()
 
-                            # explicit mention or plain id
-                            uid = _normalize_user_token(raw_val_str)
+                            # explicit mention (already recognised by the
+                            # tokenizer) or plain id
+                            if token is not None and token.kind == "user":
+                                uid = token.value
+                            else:
+                                uid = _normalize_user_token(raw_val_str)
                             if uid:
                                 value = uid
-                                logging.debug(
-                                    f"User token normalized from mention/id: {uid}"
-                                )
+                                logger.debug("User token normalized to %s", uid)
                             else:
                                 # mailto form: <mailto:...|...>
-                                mailto = _extract_mailto(raw_val_str)
+                                if token is not None and token.kind == "mailto":
+                                    mailto = token.value
+                                else:
+                                    mailto = _extract_mailto(raw_val_str)
                                 if mailto:
                                     email_candidate = mailto
                                 # bare-looking email address
@@ -319,10 +348,8 @@ def register_commands(app: AsyncApp):
                                 if isinstance(data, dict):
                                     user_obj = data.get("user") or {}
                                     uid = user_obj.get("id")
-                                    logging.debug(
-                                        f"Lookup by email '{email}' returned: {uid} (raw response: {data})"
-                                    )
-                                    if uid and re.match(r"^[UW][A-Z0-9]+$", uid):
+                                    logger.debug("Lookup by email returned %s", uid)
+                                    if uid and USER_ID_RE.fullmatch(uid):
                                         value = uid
                                         kwargs_for_params["email"] = email
                                     else:
@@ -331,21 +358,23 @@ def register_commands(app: AsyncApp):
                                         kwargs_for_params["email"] = email
                                 else:
                                     # Unexpected response type -> treat as unresolved but pass email
-                                    logging.debug(
-                                        f"Unexpected response type for users_lookupByEmail: {resp}"
+                                    logger.debug(
+                                        "Unexpected users_lookupByEmail response type %s",
+                                        type(resp).__name__,
                                     )
                                     value = None
                                     kwargs_for_params["email"] = email
                             except SlackApiError as e:
                                 # On API error (not found, missing scopes, etc.), do not propagate error to caller.
                                 # Instead set user to None and pass the email through.
-                                logging.debug(
-                                    f"Slack API error looking up email '{email}': {getattr(e, 'response', str(e))}"
+                                logger.debug(
+                                    "Slack API error looking up email: %s",
+                                    e.response.get("error") if e.response else e,
                                 )
                                 value = None
                                 kwargs_for_params["email"] = email
                             except Exception:
-                                logging.exception("Error looking up user by email")
+                                logger.exception("Error looking up user by email")
                                 value = None
                                 kwargs_for_params["email"] = email
                         # If neither uid nor email_candidate produced a value, and we still don't have a value,
@@ -359,7 +388,10 @@ def register_commands(app: AsyncApp):
                                 f"Parameter '{pname}' must be a channel mention or ID (e.g. <#C123ABC|name>)."
                             )
                             continue
-                        chan = _normalize_channel_token(raw_val)
+                        if token is not None and token.kind == "channel":
+                            chan = token.value
+                        else:
+                            chan = _normalize_channel_token(raw_val)
                         if chan:
                             value = chan
                         else:
@@ -398,10 +430,7 @@ def register_commands(app: AsyncApp):
                     else:
                         # string or unknown types => treat as string and decode escape sequences
                         if isinstance(raw_val, str):
-                            try:
-                                value = codecs.decode(raw_val, "unicode_escape")
-                            except Exception:
-                                value = raw_val
+                            value = decode_escapes(raw_val)
                         else:
                             value = str(raw_val)
 
@@ -420,11 +449,18 @@ def register_commands(app: AsyncApp):
                 await respond(f"The `{command_name}` command is not yet implemented.")
                 return
 
+            # Everything the user was told, so the audit log records the outcome.
+            replies: list[str] = []
+
+            async def audited_respond(text: str = "", *args, **kwargs):
+                replies.append(text)
+                return await respond(text, *args, **kwargs)
+
             sig = inspect.signature(handler)
             handler_kwargs: dict[str, Any] = {
                 "ack": ack,
                 "client": client,
-                "respond": respond,
+                "respond": audited_respond,
                 "performer": user_id,
             }
 
@@ -441,7 +477,21 @@ def register_commands(app: AsyncApp):
                     if pname in sig.parameters:
                         handler_kwargs[pname] = pvalue
 
-            await handler(**handler_kwargs)
+            ok = False
+            try:
+                await handler(**handler_kwargs)
+                ok = True
+            finally:
+                env.audit.record(
+                    performer=user_id,
+                    command=command_name,
+                    latency=perf_counter() - started,
+                    ok=ok,
+                    entity=kwargs_for_params.get("entity"),
+                    action=kwargs_for_params.get("action"),
+                    value=kwargs_for_params.get("value"),
+                    result=replies[-1] if replies else None,
+                )
             return
 
         is_admin = user_id == config.slack.maintainer_id
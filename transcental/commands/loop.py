@@ -0,0 +1,41 @@
+from slack_bolt.async_app import AsyncAck
+from slack_bolt.async_app import AsyncRespond
+from slack_sdk.web.async_client import AsyncWebClient
+
+from transcental.utils.monitor import monitor
+
+# Slack cuts off long messages; the innermost frames are the interesting ones
+STACK_LINES = 12
+
+
+async def loop_handler(
+    ack: AsyncAck,
+    client: AsyncWebClient,
+    respond: AsyncRespond,
+    performer: str,
+):
+    await ack()
+    stats = monitor.stats()
+    if not stats["enabled"]:
+        await respond("The event loop monitor is off (MONITOR__ENABLED=false).")
+        return
+
+    lag = stats["lag_ms"]
+    tasks = stats["tasks"]
+    lines = [
+        f"*Event loop lag* over the last {lag['window_seconds']}s: "
+        f"p50 {lag['p50']}ms, p99 {lag['p99']}ms, max {lag['max']}ms",
+        f"*Tasks:* {tasks['total']} ("
+        + ", ".join(f"{name} ×{count}" for name, count in tasks["top"].items())
+        + ")",
+        f"*Stalls over {stats['threshold_ms']:.0f}ms:* {stats['stall_count']}",
+    ]
+    if stats["stalls"]:
+        stall = stats["stalls"][-1]
+        at = int(stall["at"])
+        stack = "".join(stall["stack"].splitlines(keepends=True)[-STACK_LINES:])
+        lines.append(
+            f"Latest: {stall['seconds'] * 1000:.0f}ms at "
+            f"<!date^{at}^{{time_secs}}|{at}>\n```{stack}```"
+        )
+    await respond("\n".join(lines))
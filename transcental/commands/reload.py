@@ -0,0 +1,31 @@
+from pydantic import ValidationError
+from slack_bolt.async_app import AsyncAck
+from slack_bolt.async_app import AsyncRespond
+from slack_sdk.web.async_client import AsyncWebClient
+
+
+async def reload_handler(
+    ack: AsyncAck,
+    client: AsyncWebClient,
+    respond: AsyncRespond,
+    performer: str,
+):
+    from transcental.env import env
+
+    await ack()
+    try:
+        applied, restart = await env.reload_config()
+    except ValidationError as e:
+        errors = "\n".join(
+            f"• `{'.'.join(str(part) for part in error['loc'])}`: {error['msg']}"
+            for error in e.errors()
+        )
+        await respond(f"The new settings are invalid, nothing was changed:\n{errors}")
+        return
+
+    lines = []
+    if applied:
+        lines.append("*Applied:* " + ", ".join(f"`{key}`" for key in applied))
+    if restart:
+        lines.append("*Needs a restart:* " + ", ".join(f"`{key}`" for key in restart))
+    await respond("\n".join(lines) or "No settings changed.")
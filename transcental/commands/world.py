@@ -6,16 +6,11 @@ from slack_bolt.async_app import AsyncAck
 from slack_bolt.async_app import AsyncRespond
 from slack_sdk.web.async_client import AsyncWebClient
 
+from transcental.utils.blocks import BlockTemplate
 
-async def world_handler(
-    ack: AsyncAck,
-    client: AsyncWebClient,
-    respond: AsyncRespond,
-    performer: str,
-    channel: str,
-    text="nothing",
-):
-    msg = (
+
+WORLD_MESSAGE = BlockTemplate(
+    lambda performer, text: (
         Message()
         .add_block(
             Section(f"<@{performer}> said {text}").accessory(
@@ -32,5 +27,19 @@ async def world_handler(
             )
         )
         .build()
-    )
+    ),
+    "performer",
+    "text",
+)
+
+
+async def world_handler(
+    ack: AsyncAck,
+    client: AsyncWebClient,
+    respond: AsyncRespond,
+    performer: str,
+    channel: str,
+    text="nothing",
+):
+    msg = WORLD_MESSAGE.render(performer=performer, text=text)
     await client.chat_postMessage(channel=channel, **msg)
@@ -1,3 +1,7 @@
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import model_validator
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings
 from pydantic_settings import SettingsConfigDict
@@ -10,6 +14,28 @@ class SlackConfig(BaseSettings):
     app_token: str | None = None
     whitelist_channel: str
     heartbeat_channel: str | None = None
+    api_url: str = "https://slack.com/api/"
+    dedup_ttl: int = 300
+    dedup_size: int = 4096
+    message_channels: list[str] = []
+    message_throttle: float = 2.0
+    # "auto" uses Socket Mode when app_token is set and HTTP otherwise
+    transport: Literal["auto", "socket", "http"] = "auto"
+    socket_connections: int = 2  # concurrent Socket Mode connections (Slack allows 10)
+
+    @model_validator(mode="after")
+    def check_transport(self):
+        if self.transport == "socket" and not self.app_token:
+            raise ValueError("the socket transport needs SLACK__APP_TOKEN")
+        if not 1 <= self.socket_connections <= 10:
+            raise ValueError("socket_connections must be between 1 and 10")
+        return self
+
+    @property
+    def socket_mode(self) -> bool:
+        return self.transport == "socket" or (
+            self.transport == "auto" and bool(self.app_token)
+        )
 
 
 class StarletteConfig(BaseSettings):
@@ -19,6 +45,96 @@ class StarletteConfig(BaseSettings):
 class HomeAssistantConfig(BaseSettings):
     url: str
     token: str
+    timeout: float = 10.0  # per service call
+    failure_threshold: int = 3  # consecutive failures before failing fast
+    reset_timeout: float = 30.0  # seconds before probing again
+    reconnect_max: float = 60.0  # cap on the websocket reconnect backoff
+    light: str = "light.bedroom"  # the light shown on the website
+    entities: list[str] = []  # anything else to mirror into the cache
+    public: list[str] = []  # mirrored entities anyone may read, besides the light
+
+    @property
+    def mirrored(self) -> list[str]:
+        return [self.light, *(e for e in self.entities if e != self.light)]
+
+    @property
+    def shown(self) -> frozenset[str]:
+        # the rest are only served to API token holders
+        return frozenset((self.light, *self.public))
+
+
+class BusConfig(BaseModel):
+    # "local" keeps everything in-process (single worker); "socket" and "postgres"
+    # let one worker own the Home Assistant subscription and share its state.
+    backend: Literal["local", "socket", "postgres"] = "local"
+    socket_path: str = "/tmp/transcental.sock"
+    channel: str = "transcental_state"
+    retry: float = 2.0
+
+
+class LoggingConfig(BaseModel):
+    level: str | None = None  # DEBUG outside production, INFO in it
+    format: Literal["text", "json"] = "text"
+    levels: dict[str, str] = {}  # per-logger overrides, e.g. {"slack_bolt": "WARNING"}
+    sample: dict[str, float] = {}  # fraction of DEBUG/INFO records to keep per logger
+    rate_limit: float = 0.0  # records/second per call site, 0 disables
+    rate_burst: int = 10
+
+
+class TracingConfig(BaseModel):
+    sample: float = 0.0  # fraction of traces to record, 0 disables tracing
+    exporter: Literal["file", "otlp"] = "file"
+    path: str = "traces.jsonl"  # JSON lines, one span per line
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"  # OTLP/HTTP JSON
+    flush_interval: float = 1.0
+    max_buffer: int = 10_000  # spans held between flushes; extras are dropped
+
+
+class AuditConfig(BaseModel):
+    enabled: bool = True
+    queue_size: int = 10_000  # rows waiting to be written; extras are dropped
+    batch_size: int = 500
+    flush_interval: float = 1.0
+
+
+class DatabaseConfig(BaseModel):
+    pool_min: int = 2
+    pool_max: int = 10
+    statement_cache_size: int = 100  # per connection; 0 if behind pgbouncer
+    statement_lifetime: float = 300.0
+    command_timeout: float = 30.0
+    connect_timeout: float = 10.0
+
+
+class WebsocketConfig(BaseModel):
+    max_connections: int = 1000  # per worker
+    ping_interval: float = 20.0
+    idle_timeout: float = 60.0  # close clients we haven't heard from in this long
+    send_timeout: float = 10.0  # close clients that stop reading
+    drain_timeout: float = 5.0
+    replay: int = 256  # states kept for /events clients resuming with Last-Event-ID
+
+
+class MonitorConfig(BaseModel):
+    enabled: bool = True
+    interval: float = 0.25  # how often the loop is sampled for lag
+    threshold: float = 0.1  # stalls longer than this are logged with a stack
+    stalls: int = 20  # recent stalls kept for /api/loop
+
+
+class ShutdownConfig(BaseModel):
+    # how long running commands get to finish once a shutdown starts; also
+    # uvicorn's limit for open HTTP requests, counted down at the same time
+    timeout: float = 20.0
+
+
+class LimitsConfig(BaseModel):
+    # checked before anything is parsed, so oversized input is turned away cheaply
+    text_length: int = 2000  # slash command text, in characters
+    tokens: int = 200  # words in a slash command
+    json_size: int = 4096  # `raw` service data, in characters
+    json_depth: int = 8
+    body_size: int = 65_536  # /api/ha request bodies, in bytes
 
 
 class Config(BaseSettings):
@@ -29,9 +145,30 @@ class Config(BaseSettings):
     home_assistant: HomeAssistantConfig
     starlette: StarletteConfig
     database_url: PostgresDsn
+    database: DatabaseConfig = DatabaseConfig()
     environment: str = "development"
     timezone: str = "Europe/London"
     port: int = 3000
+    workers: int = 1
+    api_token: str | None = None  # bearer token for /api/*; unset disables them
+    bus: BusConfig = BusConfig()
+    logging: LoggingConfig = LoggingConfig()
+    tracing: TracingConfig = TracingConfig()
+    audit: AuditConfig = AuditConfig()
+    websocket: WebsocketConfig = WebsocketConfig()
+    shutdown: ShutdownConfig = ShutdownConfig()
+    monitor: MonitorConfig = MonitorConfig()
+    limits: LimitsConfig = LimitsConfig()
+
+    @model_validator(mode="after")
+    def check_bus(self):
+        if self.workers > 1 and self.bus.backend == "local":
+            # every worker would elect itself and follow Home Assistant, run
+            # the scheduler and open Socket Mode connections on its own
+            raise ValueError(
+                'WORKERS > 1 needs a shared state bus: set BUS__BACKEND to "socket" or "postgres"'
+            )
+        return self
 
 
 config = Config()  # type: ignore
@@ -0,0 +1,31 @@
+from transcental.domains.base import DomainHandler
+from transcental.domains.climate import ClimateHandler
+from transcental.domains.cover import CoverHandler
+from transcental.domains.light import LightHandler
+from transcental.domains.media_player import MediaPlayerHandler
+from transcental.domains.switch import SwitchHandler
+
+DOMAINS: dict[str, DomainHandler] = {
+    handler.domain: handler
+    for handler in (
+        LightHandler(),
+        SwitchHandler(),
+        ClimateHandler(),
+        MediaPlayerHandler(),
+        CoverHandler(),
+    )
+}
+# anything else still gets on/off/toggle/raw and its bare state
+GENERIC = DomainHandler()
+
+
+def handler_for(entity_id: str) -> DomainHandler:
+    return DOMAINS.get(entity_id.partition(".")[0], GENERIC)
+
+
+def action_names() -> list[str]:
+    """Every action some domain accepts, for the slash command's choices."""
+    names = dict.fromkeys(GENERIC.actions)
+    for handler in DOMAINS.values():
+        names.update(dict.fromkeys(handler.actions))
+    return list(names)
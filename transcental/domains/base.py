@@ -0,0 +1,94 @@
+import json
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Callable
+from typing import ClassVar
+from typing import Optional
+
+from transcental.config import config
+from transcental.utils.limits import check_json
+
+
+class InvalidAction(ValueError):
+    """An action or value the user got wrong; the message is shown to them."""
+
+
+@dataclass(frozen=True, slots=True)
+class ServiceCall:
+    service: str
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+class DomainHandler:
+    """Everything we know about one Home Assistant entity domain: the actions
+    it accepts, the service each maps to, and the compact state kept in the
+    cache for its entities.
+
+    `actions` maps each action name (aliases included) straight to its parser,
+    so dispatch is a single dict lookup however many domains there are.
+    Subclasses extend it with `{**DomainHandler.actions, ...}`.
+    """
+
+    domain: ClassVar[str] = ""
+
+    def on(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("turn_on")
+
+    def off(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("turn_off")
+
+    def toggle(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("toggle")
+
+    def raw(self, value: Optional[str]) -> ServiceCall:
+        # Expect: "<service> <json-object>" or just "<service>" (no service_data)
+        if value is None:
+            raise InvalidAction(
+                "Raw command requires a service name, optionally followed by JSON service_data."
+            )
+        svc, _, payload = value.partition(" ")
+        if not payload.strip():
+            return ServiceCall(svc)
+        limits = config.limits
+        try:
+            check_json(payload, limits.json_size, limits.json_depth)
+        except ValueError as exc:
+            raise InvalidAction(f"Raw service_data JSON is {exc}.")
+        try:
+            parsed = json.loads(payload)
+        except json.JSONDecodeError as exc:
+            raise InvalidAction(f"Invalid JSON for raw service_data: {exc.msg}")
+        if not isinstance(parsed, dict):
+            raise InvalidAction("Raw service_data JSON must be an object/dictionary.")
+        return ServiceCall(svc, parsed)
+
+    actions: ClassVar[dict[str, Callable[..., ServiceCall]]] = {
+        "on": on,
+        "off": off,
+        "toggle": toggle,
+        "raw": raw,
+    }
+
+    def parse(self, action: str, value: Optional[str]) -> ServiceCall:
+        parser = self.actions.get(action.lower())
+        if parser is None:
+            raise InvalidAction(f"Unknown action: {action}")
+        return parser(self, value)
+
+    def encode(self, state: str, attributes: dict[str, Any]) -> dict[str, Any]:
+        """The cache's (and so every client's) view of an entity's state."""
+        return {"state": state}
+
+
+def require(value: Optional[str], message: str) -> str:
+    if value is None:
+        raise InvalidAction(message)
+    return value
+
+
+def parse_int(value: str, message: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidAction(message)
@@ -0,0 +1,41 @@
+from typing import Any
+from typing import Optional
+
+from transcental.domains.base import DomainHandler
+from transcental.domains.base import InvalidAction
+from transcental.domains.base import require
+from transcental.domains.base import ServiceCall
+
+HVAC_MODES = ("off", "heat", "cool", "heat_cool", "auto", "dry", "fan_only")
+
+
+class ClimateHandler(DomainHandler):
+    domain = "climate"
+
+    def temperature(self, value: Optional[str]) -> ServiceCall:
+        raw = require(value, "Temperature command requires a target temperature.")
+        try:
+            target = float(raw)
+        except ValueError:
+            raise InvalidAction("Temperature must be a number.")
+        return ServiceCall("set_temperature", {"temperature": target})
+
+    def mode(self, value: Optional[str]) -> ServiceCall:
+        mode = require(value, f"Mode must be one of: {', '.join(HVAC_MODES)}.").lower()
+        if mode not in HVAC_MODES:
+            raise InvalidAction(f"Mode must be one of: {', '.join(HVAC_MODES)}.")
+        return ServiceCall("set_hvac_mode", {"hvac_mode": mode})
+
+    actions = {
+        **DomainHandler.actions,
+        "temperature": temperature,
+        "temp": temperature,
+        "mode": mode,
+    }
+
+    def encode(self, state: str, attributes: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "mode": state,
+            "target": attributes.get("temperature"),
+            "current": attributes.get("current_temperature"),
+        }
@@ -0,0 +1,44 @@
+from typing import Any
+from typing import Optional
+
+from transcental.domains.base import DomainHandler
+from transcental.domains.base import InvalidAction
+from transcental.domains.base import parse_int
+from transcental.domains.base import require
+from transcental.domains.base import ServiceCall
+
+
+class CoverHandler(DomainHandler):
+    domain = "cover"
+
+    def open(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("open_cover")
+
+    def close(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("close_cover")
+
+    def stop(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("stop_cover")
+
+    def position(self, value: Optional[str]) -> ServiceCall:
+        pct = parse_int(
+            require(value, "Position command requires a value (0-100)."),
+            "Position must be an integer percentage (0-100).",
+        )
+        if not (0 <= pct <= 100):
+            raise InvalidAction("Position percent must be between 0 and 100.")
+        return ServiceCall("set_cover_position", {"position": pct})
+
+    actions = {
+        **DomainHandler.actions,
+        # covers have no turn_on/turn_off; treat them as open/close
+        "on": open,
+        "off": close,
+        "open": open,
+        "close": close,
+        "stop": stop,
+        "position": position,
+    }
+
+    def encode(self, state: str, attributes: dict[str, Any]) -> dict[str, Any]:
+        return {"state": state, "position": attributes.get("current_position")}
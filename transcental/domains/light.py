@@ -0,0 +1,93 @@
+import re
+from typing import Any
+from typing import Optional
+
+from transcental.domains.base import DomainHandler
+from transcental.domains.base import InvalidAction
+from transcental.domains.base import parse_int
+from transcental.domains.base import require
+from transcental.domains.base import ServiceCall
+
+# rgb(...), rgbw(...) and rgbww(...)
+_RGB_RE = re.compile(r"^(?P<name>rgbw?w?)\s*\(\s*(?P<body>.+)\s*\)\s*$", re.I)
+_RGB_KEYS = {
+    ("rgb", 3): "rgb_color",
+    ("rgbw", 4): "rgbw_color",
+    ("rgbww", 5): "rgbww_color",
+}
+
+
+class LightHandler(DomainHandler):
+    domain = "light"
+
+    def brightness(self, value: Optional[str]) -> ServiceCall:
+        pct = parse_int(
+            require(value, "Brightness command requires a value (0-100)."),
+            "Brightness must be an integer percentage (0-100).",
+        )
+        if not (0 <= pct <= 100):
+            raise InvalidAction("Brightness percent must be between 0 and 100.")
+        return ServiceCall("turn_on", {"brightness_pct": pct})
+
+    def temperature(self, value: Optional[str]) -> ServiceCall:
+        kelvin = parse_int(
+            require(value, "Temperature command requires a numeric kelvin value."),
+            "Temperature must be an integer (kelvin).",
+        )
+        # Many integrations accept "kelvin" for color temperature. If your integration uses
+        # a different key (color_temp, color_temp_kelvin), change this to match HA schema.
+        return ServiceCall("turn_on", {"kelvin": kelvin})
+
+    def colour(self, value: Optional[str]) -> ServiceCall:
+        v = require(
+            value,
+            "Colour command requires a value (e.g. #RRGGBB, rgb(255,0,0), rgbw(...), red).",
+        )
+        # Hex color like #RRGGBB (case-insensitive)
+        if v.startswith("#") and len(v) == 7:
+            try:
+                rgb = [int(v[i : i + 2], 16) for i in (1, 3, 5)]
+            except ValueError:
+                raise InvalidAction(f"Invalid hex color: {v}")
+            return ServiceCall("turn_on", {"rgb_color": rgb})
+
+        m = _RGB_RE.match(v)
+        if not m:
+            # Fallback to color name (string). Home Assistant accepts `color_name`.
+            return ServiceCall("turn_on", {"color_name": v})
+        name = m.group("name").lower()
+        parts = [p.strip() for p in m.group("body").split(",")]
+        try:
+            nums = [int(p) for p in parts if p != ""]
+        except ValueError:
+            raise InvalidAction("RGB values must be integers.")
+        key = _RGB_KEYS.get((name, len(nums)))
+        if key is None:
+            raise InvalidAction(
+                f"Invalid {name} format or wrong number of components: {v}"
+            )
+        return ServiceCall("turn_on", {key: nums})
+
+    actions = {
+        **DomainHandler.actions,
+        "brightness": brightness,
+        "temperature": temperature,
+        "temp": temperature,
+        "kelvin": temperature,
+        "colour": colour,
+        "color": colour,
+    }
+
+    def encode(self, state: str, attributes: dict[str, Any]) -> dict[str, Any]:
+        # Home Assistant reports colour and brightness as null while a light is off
+        rgb = attributes.get("rgb_color") or (255, 255, 255)
+        brightness = attributes.get("brightness")
+        temperature = attributes.get("color_temp")
+        return {
+            "colour": f"rgb({rgb[0]},{rgb[1]},{rgb[2]})",
+            "on": state == "on",
+            "brightness": int(
+                ((255 if brightness is None else brightness) / 255) * 100
+            ),
+            "temperature": 4000 if temperature is None else temperature,
+        }
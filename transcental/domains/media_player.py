@@ -0,0 +1,66 @@
+from typing import Any
+from typing import Optional
+
+from transcental.domains.base import DomainHandler
+from transcental.domains.base import InvalidAction
+from transcental.domains.base import parse_int
+from transcental.domains.base import require
+from transcental.domains.base import ServiceCall
+
+
+class MediaPlayerHandler(DomainHandler):
+    domain = "media_player"
+
+    def play(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("media_play")
+
+    def pause(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("media_pause")
+
+    def next(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("media_next_track")
+
+    def previous(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("media_previous_track")
+
+    def volume(self, value: Optional[str]) -> ServiceCall:
+        pct = parse_int(
+            require(value, "Volume command requires a value (0-100)."),
+            "Volume must be an integer percentage (0-100).",
+        )
+        if not (0 <= pct <= 100):
+            raise InvalidAction("Volume percent must be between 0 and 100.")
+        return ServiceCall("volume_set", {"volume_level": pct / 100})
+
+    def mute(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("volume_mute", {"is_volume_muted": True})
+
+    def unmute(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall("volume_mute", {"is_volume_muted": False})
+
+    def source(self, value: Optional[str]) -> ServiceCall:
+        return ServiceCall(
+            "select_source",
+            {"source": require(value, "Source command requires a source name.")},
+        )
+
+    actions = {
+        **DomainHandler.actions,
+        "play": play,
+        "pause": pause,
+        "next": next,
+        "previous": previous,
+        "volume": volume,
+        "mute": mute,
+        "unmute": unmute,
+        "source": source,
+    }
+
+    def encode(self, state: str, attributes: dict[str, Any]) -> dict[str, Any]:
+        volume = attributes.get("volume_level")
+        return {
+            "state": state,
+            "volume": round(volume * 100) if volume is not None else None,
+            "muted": attributes.get("is_volume_muted"),
+            "title": attributes.get("media_title"),
+        }
@@ -0,0 +1,10 @@
+from typing import Any
+
+from transcental.domains.base import DomainHandler
+
+
+class SwitchHandler(DomainHandler):
+    domain = "switch"
+
+    def encode(self, state: str, attributes: dict[str, Any]) -> dict[str, Any]:
+        return {"on": state == "on"}
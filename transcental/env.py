@@ -1,24 +1,51 @@
 import asyncio
 import contextlib
 import logging
+import signal
+import threading
+from threading import Event
 from threading import Thread
 from time import time
+from typing import Iterable
 
+from aiohttp import ClientError
 from aiohttp import ClientSession
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from homeassistant_api import Client
 from homeassistant_api import WebsocketClient
+from homeassistant_api.errors import InternalServerError
+from homeassistant_api.errors import RequestTimeoutError
+from pydantic import ValidationError
 from slack_bolt.async_app import AsyncApp
 from slack_sdk.web.async_client import AsyncWebClient
 from starlette.applications import Starlette
 
 from transcental.actions import register_actions
+from transcental.cache import cache
 from transcental.commands import register_commands
 from transcental.config import config
+from transcental.domains import handler_for
 from transcental.events import register_events
 from transcental.shortcuts import register_shortcuts
 from transcental.tasks import register_tasks
+from transcental.utils.audit import AuditWriter
+from transcental.utils.audit import create_audit_writer
+from transcental.utils.breaker import CircuitBreaker
+from transcental.utils.broadcast import Broadcaster
+from transcental.utils.bus import Bus
+from transcental.utils.bus import create_bus
+from transcental.utils.database import Database
+from transcental.utils.light import stop_following
 from transcental.utils.light import update_light
+from transcental.utils.logging import configure_logging
 from transcental.utils.logging import send_heartbeat
+from transcental.utils.monitor import monitor
+from transcental.utils.reload import reloader
+from transcental.utils.shutdown import inflight
+from transcental.utils.sockets import SocketHub
+from transcental.utils.tracing import tracer
+from transcental.utils.transport import SocketModePool
+from transcental.utils.transport import start_transport
 from transcental.views import register_views
 
 logger = logging.getLogger(__name__)
@@ -28,7 +55,10 @@ class Environment:
     slack_client: AsyncWebClient
     http: ClientSession
     app = AsyncApp(
-        token=config.slack.bot_token, signing_secret=config.slack.signing_secret
+        client=AsyncWebClient(
+            token=config.slack.bot_token, base_url=config.slack.api_url
+        ),
+        signing_secret=config.slack.signing_secret,
     )
     home = Client(
         f"http://{config.home_assistant.url}/api",
@@ -38,56 +68,306 @@ class Environment:
     ws_home = WebsocketClient(
         f"ws://{config.home_assistant.url}/api/websocket", config.home_assistant.token
     )
+    home_breaker = CircuitBreaker(
+        "home_assistant",
+        threshold=config.home_assistant.failure_threshold,
+        reset_timeout=config.home_assistant.reset_timeout,
+        timeout=config.home_assistant.timeout,
+        trips_on=(OSError, ClientError, RequestTimeoutError, InternalServerError),
+    )
 
-    update_queue: asyncio.Queue
+    updates: Broadcaster
+    sockets: SocketHub
+    audit: AuditWriter
+    db: Database
+    bus: Bus
     loop: asyncio.AbstractEventLoop
+    transport: SocketModePool | None = None
+    scheduler: AsyncIOScheduler
+    background: set[asyncio.Task]
+    home_stop: Event
+    home_thread: Thread | None = None
+    # entities the Home Assistant thread mirrors into the cache
+    mirrored: frozenset[str] = frozenset(config.home_assistant.mirrored)
+    stopping = False
+    tracing: asyncio.Task | None = None
+
+    def receive(self, message: dict):
+        """Called by the bus with every message: the leader's state snapshots,
+        and other workers' broadcasts."""
+        if message.get("type") == "reload":
+            self.spawn(self._reload(broadcast=False), "config reload")
+        else:
+            self.apply_state(message)
+
+    def apply_state(self, snapshot: dict):
+        """Called on every worker when the leader publishes state."""
+        with tracer.span(
+            "ws.push", parent=snapshot.get("trace"), subscribers=len(self.updates)
+        ):
+            cache.load(snapshot)
+            self.sockets.record()
+            self.updates.publish("light_update")
+
+    def load_states(self, states: dict[str, dict]):
+        """Called on the loop (via call_soon_threadsafe) with every mirrored
+        entity's state once the HA thread has (re)connected."""
+        cache.stale_since = None
+        self.update_states(states)
+
+    def update_states(self, states: dict[str, dict], removed: Iterable[str] = ()):
+        """Write several entities at once and publish; like publish_state,
+        only ever called on the loop."""
+        for entity_id in removed:
+            cache.states.pop(entity_id, None)
+        cache.states.update(states)
+        self.publish_state()
+
+    def publish_state(self, entity_id: str | None = None, state: dict | None = None):
+        """Called on the loop, from the HA thread (via call_soon_threadsafe)
+        with the newly encoded `state` of `entity_id`. The cache is only
+        written on the loop, so a bus snapshot applied in between can't lose
+        the update."""
+        if entity_id is not None and state is not None:
+            cache.states[entity_id] = state
+        # Milliseconds since the epoch (or one more than last time), so versions
+        # keep increasing across restarts and leader changes.
+        cache.version = max(cache.version + 1, int(time() * 1000))
+        snapshot = cache.snapshot()
+        if entity_id and (trace := tracer.resume(entity_id, "ha.echo")):
+            # rides along on the bus so every worker's push joins the trace
+            snapshot["trace"] = trace
+        self.spawn(self.bus.publish(snapshot), "state publish")
+
+    def spawn(self, coro, what: str) -> asyncio.Task:
+        """Run `coro` in the background, holding a reference so it isn't
+        collected mid-flight and logging it if it fails."""
+        task = self.loop.create_task(coro)
+        self.background.add(task)
+        task.add_done_callback(lambda task: self._finished(task, what))
+        return task
+
+    def _finished(self, task: asyncio.Task, what: str):
+        self.background.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            logger.error("Background %s failed", what, exc_info=exc)
+
+    def mark_stale(self):
+        """Called on the loop when the HA thread loses its connection, so /ws
+        clients can tell they're looking at old state."""
+        if cache.stale_since is None:
+            cache.stale_since = time()
+            self.publish_state()
+
+    def lead(self):
+        """Called once the bus makes this process the leader. Anything that
+        must happen once across all workers starts here: the Home Assistant
+        subscription (everyone else gets its state over the bus), scheduled
+        jobs, the Socket Mode connections and the startup heartbeat."""
+        if self.stopping:
+            return
+        logger.info("Subscribing to Home Assistant events")
+        self.home_thread = Thread(
+            target=update_light, args=(self.ws_home, self, self.home_stop), daemon=True
+        )
+        self.home_thread.start()
+        self.scheduler.start()
+        self.spawn(self._lead(), "leader startup")
+
+    async def _lead(self):
+        transport = await start_transport(self.app)
+        if self.stopping:
+            # shutdown began while the connections were opening
+            if transport:
+                await transport.close()
+            return
+        self.transport = transport
+        await send_heartbeat(
+            ":neodog_nom_stick: beep boop! online!",
+            client=self.slack_client,
+        )
+
+    async def refresh_entities(self, keys: set[str]):
+        """Start or stop mirroring entities after a config reload, without
+        reconnecting to Home Assistant."""
+        self.mirrored = frozenset(config.home_assistant.mirrored)
+        if not self.bus.leader:
+            return  # the leader's snapshots will reflect the change
+        states = {}
+        for entity_id in self.mirrored - cache.states.keys():
+            try:
+                entity = await self.home_breaker.call(
+                    self.home.async_get_entity, entity_id=entity_id
+                )
+            except Exception as exc:
+                logger.warning("Could not fetch %s: %r", entity_id, exc)
+                continue
+            if entity:
+                states[entity_id] = handler_for(entity_id).encode(
+                    entity.state.state, entity.state.attributes
+                )
+        # checked after the fetches, in case another reload changed the set
+        self.update_states(states, removed=cache.states.keys() - self.mirrored)
+
+    def apply_settings(self, keys: set[str]):
+        """Pass reloaded settings on to the objects that copied them at startup."""
+        ha = config.home_assistant
+        self.home_breaker.threshold = ha.failure_threshold
+        self.home_breaker.reset_timeout = ha.reset_timeout
+        self.home_breaker.timeout = ha.timeout
+        ws = config.websocket
+        self.sockets.max_connections = ws.max_connections
+        self.sockets.ping_interval = ws.ping_interval
+        self.sockets.idle_timeout = ws.idle_timeout
+        self.sockets.send_timeout = ws.send_timeout
+        if monitor.interval != config.monitor.interval:
+            monitor.set_interval(config.monitor.interval)
+        monitor.threshold = config.monitor.threshold
+        if tracer.enabled and self.tracing is None:
+            self.tracing = asyncio.create_task(tracer.run())
+
+    def _watch_config(self):
+        reloader.watch("logging", lambda keys: configure_logging())
+        reloader.watch(
+            (
+                "home_assistant.light",
+                "home_assistant.entities",
+                "home_assistant.public",
+            ),
+            self.refresh_entities,
+        )
+        reloader.watch(
+            ("home_assistant", "websocket", "monitor", "tracing"), self.apply_settings
+        )
+        with contextlib.suppress(NotImplementedError, RuntimeError, ValueError):
+            # SIGHUP reloads, like most daemons, and is passed on to the other
+            # workers; only possible on the main thread
+            self.loop.add_signal_handler(
+                signal.SIGHUP, lambda: self.spawn(self._reload(), "config reload")
+            )
+
+    async def reload_config(
+        self, broadcast: bool = True
+    ) -> tuple[list[str], list[str]]:
+        """Reload this worker's config and have the other workers follow.
+
+        Raises pydantic's ValidationError, leaving everything untouched, if
+        the new settings are invalid (they'd be just as invalid elsewhere).
+        """
+        result = await reloader.reload()
+        if broadcast:
+            await self.bus.broadcast({"type": "reload"})
+        return result
+
+    async def _reload(self, broadcast: bool = True):
+        try:
+            await self.reload_config(broadcast)
+        except ValidationError as exc:
+            logger.error("Config reload failed, keeping current settings:\n%s", exc)
+
+    def begin_shutdown(self):
+        """Stop taking on new work: refuse new Slack requests, stop the
+        scheduler, and close /ws, SSE and long-poll clients and the Socket
+        Mode connections.
+
+        Called from a signal handler as soon as uvicorn is asked to exit, so
+        open streams are released rather than holding up uvicorn's wait for
+        connections to close, and again (as a no-op) at lifespan shutdown.
+        """
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Shutting down: no longer accepting new work")
+        inflight.accepting = False
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        self._closing = asyncio.gather(
+            self.sockets.drain(config.websocket.drain_timeout),
+            self.transport.close() if self.transport else asyncio.sleep(0),
+        )
+        # Started now rather than after uvicorn's wait for open requests, so
+        # both count down the same SHUTDOWN__TIMEOUT from the signal.
+        self._draining = asyncio.ensure_future(inflight.drain(config.shutdown.timeout))
+
+    def _chain_signals(self):
+        # uvicorn has installed its exit handlers by the time the lifespan
+        # starts (and restores the originals on exit); run ours first.
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                self.loop.call_soon_threadsafe(self.begin_shutdown)
+                previous(signum, frame)
+
+            signal.signal(sig, handler)
 
     @contextlib.asynccontextmanager
     async def enter(self, _app: Starlette):
         st = time()
         logger.debug("Entering environment context")
         self.http = ClientSession()
-        self.slack_client = AsyncWebClient(token=config.slack.bot_token)
+        self.slack_client = AsyncWebClient(
+            token=config.slack.bot_token, base_url=config.slack.api_url
+        )
         self.loop = asyncio.get_running_loop()
-        self.update_queue = asyncio.Queue()
-
-        handler = None
-        if config.slack.app_token:
-            if config.environment == "production":
-                logging.warning(
-                    "You are currently running Socket mode in production. This is NOT RECOMMENDED - you should set up a proper HTTP server with a request URL."
-                )
-            from slack_bolt.adapter.socket_mode.async_handler import (
-                AsyncSocketModeHandler,
-            )
-
-            handler = AsyncSocketModeHandler(self.app, config.slack.app_token)
-            logger.debug("Starting Socket Mode handler")
-            await handler.connect_async()
+        self.background = set()
+        self.home_stop = Event()
+        monitor.start()
+        self.updates = Broadcaster()
+        self.sockets = SocketHub(
+            self.updates,
+            max_connections=config.websocket.max_connections,
+            ping_interval=config.websocket.ping_interval,
+            idle_timeout=config.websocket.idle_timeout,
+            send_timeout=config.websocket.send_timeout,
+            replay=config.websocket.replay,
+        )
+        self.bus = create_bus()
+        self.db = Database()
+        await self.db.start()
+        self.audit = create_audit_writer()
+        self.audit.start()
 
-        Thread(target=update_light, args=(self.ws_home, self), daemon=True).start()
         register_commands(env.app)
         register_shortcuts(env.app)
         register_actions(env.app)
         register_views(env.app)
         register_events(env.app)
-        register_tasks()
+        self.scheduler = register_tasks()
+        await self.bus.start(on_message=self.receive, on_elected=self.lead)
+        self._chain_signals()
+        self.tracing = asyncio.create_task(tracer.run()) if tracer.enabled else None
+        self._watch_config()
 
-        logger.debug(f"Environment setup in {time() - st:.02}s")
-        await send_heartbeat(
-            ":neodog_nom_stick: beep boop! online!",
-            client=self.slack_client,
-        )
+        logger.debug("Environment setup in %.02fs", time() - st)
 
         yield
 
         logger.debug("Exiting environment context")
 
-        if handler:
-            logger.debug("Stopping Socket Mode handler")
-            await handler.close_async()
-
+        # 1. stop intake: new requests, scheduled jobs, streams, Socket Mode
+        self.begin_shutdown()
+        await self._closing
+        # 2. let commands that were already running finish
+        await self._draining
+        # 3. stop following Home Assistant, then flush and close the rest
+        if self.home_thread is not None:
+            stop_following(self.ws_home, self.home_stop)
+            await asyncio.to_thread(self.home_thread.join, 5)
+        await self.bus.close()
+        await self.audit.close()
+        await self.db.close()
+        if self.tracing:
+            self.tracing.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.tracing
+        await monitor.stop()
         await self.http.close()
+        logger.info("Shutdown complete")
 
 
 env = Environment()
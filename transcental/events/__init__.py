@@ -1,6 +1,7 @@
 from slack_bolt.async_app import AsyncApp
 
 from transcental.events.message import message_handler
+from transcental.utils.shutdown import inflight
 
 
 EVENTS = [
@@ -13,4 +14,4 @@ EVENTS = [
 
 def register_events(app: AsyncApp):
     for event in EVENTS:
-        app.event(event["name"])(event["handler"])
+        app.event(event["name"])(inflight.track(event["handler"]))
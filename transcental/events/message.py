@@ -1,9 +1,59 @@
+import logging
+import re
+
 from slack_bolt.async_app import AsyncSay
 from slack_sdk.web.async_client import AsyncWebClient
 
+from transcental.config import config
+from transcental.utils.ratelimit import KeyedThrottle
+from transcental.utils.reload import reloader
+
+logger = logging.getLogger(__name__)
+
+# Plain user messages only; edits, joins, bot posts etc. all carry other subtypes.
+HANDLED_SUBTYPES = {None, "thread_broadcast", "file_share"}
+
+throttle = KeyedThrottle(interval=config.slack.message_throttle)
+
+
+def _retime_throttle(keys: set[str]):
+    throttle.interval = config.slack.message_throttle
+
+
+reloader.watch("slack.message_throttle", _retime_throttle)
+
+
+async def echo_handler(say: AsyncSay, event: dict, match: re.Match):
+    await say(f'<@{event["user"]}> said "{match.group("text")}"')
+
+
+ROUTES = [
+    {
+        "pattern": re.compile(r"^\s*echo\s+(?P<text>.+)", re.I | re.S),
+        "handler": echo_handler,
+    },
+]
+
 
 async def message_handler(client: AsyncWebClient, say: AsyncSay, body: dict):
     event = body["event"]
-    user = event["user"]
-    text = event["text"]
-    await say(f'<@{user}> said "{text}"')
+    if event.get("subtype") not in HANDLED_SUBTYPES or event.get("bot_id"):
+        return
+    channel = event.get("channel")
+    allowed = config.slack.message_channels
+    if allowed and channel not in allowed:
+        return
+    user = event.get("user")
+    text = event.get("text")
+    if not user or not text:
+        return
+
+    for route in ROUTES:
+        match = route["pattern"].match(text)
+        if not match:
+            continue
+        if not throttle.allow(channel):
+            logger.debug("Throttled message route in %s", channel)
+            return
+        await route["handler"](say=say, event=event, match=match)
+        return
@@ -1,6 +1,7 @@
 from slack_bolt.async_app import AsyncApp
 
 from transcental.shortcuts.hello_world import hello_world_handler
+from transcental.utils.shutdown import inflight
 
 
 SHORTCUTS = [
@@ -13,4 +14,4 @@ SHORTCUTS = [
 
 def register_shortcuts(app: AsyncApp):
     for shortcut in SHORTCUTS:
-        app.shortcut(shortcut["id"])(shortcut["handler"])
+        app.shortcut(shortcut["id"])(inflight.track(shortcut["handler"]))
@@ -1,6 +1,20 @@
-# An example of how to create a table. Read the docs for more info: https://piccolo-orm.readthedocs.io/
-# from piccolo.table import Table
-# from piccolo.columns import Integer, Text, Varchar
-# class Person(Table):
-#     slack_id = Varchar(length=20, index=True)
-#     age = Integer()
+from piccolo.columns import Boolean
+from piccolo.columns import Real
+from piccolo.columns import Text
+from piccolo.columns import Timestamptz
+from piccolo.columns import Varchar
+from piccolo.table import Table
+
+
+class AuditLog(Table):
+    """One row per slash command run, written in batches by `AuditWriter`."""
+
+    created_at = Timestamptz(index=True)
+    performer = Varchar(length=20, index=True)
+    command = Varchar(length=50)
+    entity = Varchar(length=255, null=True, default=None, index=True)
+    action = Varchar(length=50, null=True, default=None)
+    value = Text(null=True, default=None)
+    latency_ms = Real()
+    ok = Boolean(default=True)  # False when the handler raised
+    result = Text(null=True, default=None)  # the last thing we told the user
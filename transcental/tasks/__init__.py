@@ -3,7 +3,8 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from transcental.config import config
 
 
-def register_tasks():
+def register_tasks() -> AsyncIOScheduler:
+    """Jobs run on the bus leader only, which starts the scheduler once elected."""
     scheduler = AsyncIOScheduler(timezone=config.timezone)
     # scheduler.add_job(
     #     task,
@@ -13,4 +14,4 @@ def register_tasks():
     #     next_run_time=datetime.now(),
     # )
 
-    scheduler.start()
+    return scheduler
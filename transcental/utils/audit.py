@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+
+from transcental.config import config
+from transcental.tables import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """Buffers audit rows in a bounded queue and inserts them in batches.
+
+    `record()` never waits: when the database can't keep up and the queue is
+    full, new rows are dropped and counted rather than slowing down commands.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(queue_size)
+        self._pending: list[dict[str, Any]] = []
+        self._inflight: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if config.audit.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    def record(
+        self,
+        performer: str,
+        command: str,
+        latency: float,
+        ok: bool,
+        entity: str | None = None,
+        action: str | None = None,
+        value: str | None = None,
+        result: str | None = None,
+    ):
+        if self._task is None:
+            return  # auditing disabled
+        row = {
+            "created_at": datetime.now(timezone.utc),
+            "performer": performer,
+            # a bad row would fail its whole batch, so keep to the column sizes
+            "command": command[:50],
+            "entity": entity[:255] if entity else entity,
+            "action": action[:50] if action else action,
+            "value": value,
+            "latency_ms": latency * 1000,
+            "ok": ok,
+            "result": result,
+        }
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped in (1, 10, 100) or self.dropped % 1000 == 0:
+                logger.warning("Audit queue full, %d rows dropped", self.dropped)
+
+    def _take(self) -> list[dict[str, Any]]:
+        batch, self._pending = self._pending, []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: list[dict[str, Any]]):
+        try:
+            await AuditLog.insert(*(AuditLog(**row) for row in batch))
+            self.written += len(batch)
+        except Exception:
+            logger.warning("Failed to write %d audit rows", len(batch), exc_info=True)
+
+    async def flush(self):
+        while batch := self._take():
+            # shielded so shutdown can't cancel an insert halfway through
+            self._inflight = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._inflight)
+
+    async def _run(self):
+        while True:
+            self._pending.append(await self._queue.get())
+            # give a burst a moment to fill the batch before paying for a round trip
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self):
+        """Stop the background task and write whatever is still queued."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._inflight:
+            await self._inflight
+        await self.flush()
+
+
+def history_query(
+    limit: int = 50,
+    before: int | None = None,
+    performer: str | None = None,
+    entity: str | None = None,
+):
+    query = AuditLog.select().order_by(AuditLog.id, ascending=False).limit(limit)
+    if before is not None:
+        query = query.where(AuditLog.id < before)
+    if performer is not None:
+        query = query.where(AuditLog.performer == performer)
+    if entity is not None:
+        query = query.where(AuditLog.entity == entity)
+    return query
+
+
+async def audit_history(
+    limit: int = 50,
+    before: int | None = None,
+    performer: str | None = None,
+    entity: str | None = None,
+) -> tuple[list[dict[str, Any]], int | None]:
+    """Newest-first page of audit rows, plus the `before` cursor for the next
+    page (None on the last one)."""
+    rows = await history_query(limit, before, performer, entity)
+    for row in rows:
+        row["created_at"] = row["created_at"].isoformat()
+    cursor = rows[-1]["id"] if len(rows) == limit else None
+    return rows, cursor
+
+
+def create_audit_writer() -> AuditWriter:
+    return AuditWriter(
+        config.audit.queue_size, config.audit.batch_size, config.audit.flush_interval
+    )
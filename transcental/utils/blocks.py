@@ -0,0 +1,68 @@
+import re
+from typing import Any
+from typing import Callable
+
+_FIELD_RE = re.compile(r"\x00(\w+)\x00")
+
+Filler = Callable[[dict[str, str]], Any]
+
+
+def _placeholder(name: str) -> str:
+    return f"\x00{name}\x00"
+
+
+def _compile(node: Any) -> Filler | None:
+    """Turn a built payload into a filler for its dynamic parts.
+
+    Returns None for subtrees without placeholders; those are shared as-is
+    between renders rather than copied.
+    """
+    if isinstance(node, str):
+        parts = _FIELD_RE.split(node)
+        if len(parts) == 1:
+            return None
+        # split() alternates literal text and field names: [lit, name, lit, ...]
+        literals, names = parts[::2], parts[1::2]
+
+        def fill_str(values: dict[str, str]) -> str:
+            out = [literals[0]]
+            for name, literal in zip(names, literals[1:]):
+                out.append(values[name])
+                out.append(literal)
+            return "".join(out)
+
+        return fill_str
+
+    if isinstance(node, dict):
+        fillers = {k: f for k, v in node.items() if (f := _compile(v))}
+        if not fillers:
+            return None
+        return lambda values: node | {k: f(values) for k, f in fillers.items()}
+
+    if isinstance(node, list):
+        items = [(item, _compile(item)) for item in node]
+        if not any(f for _, f in items):
+            return None
+        return lambda values: [f(values) if f else item for item, f in items]
+
+    return None
+
+
+class BlockTemplate:
+    """A Block Kit payload that is built and validated once, then filled per call.
+
+    `build` receives a placeholder string for each of `fields` and must return
+    the built payload (e.g. `Modal()...build()`). Rendering only rebuilds the
+    containers leading to those placeholders; everything else is shared between
+    renders, so rendered payloads must be treated as read-only.
+    """
+
+    def __init__(self, build: Callable[..., dict], *fields: str):
+        self.fields = fields
+        self.payload = build(**{name: _placeholder(name) for name in fields})
+        self._fill = _compile(self.payload)
+
+    def render(self, **values: str) -> dict:
+        if self._fill is None:
+            return self.payload
+        return self._fill(values)
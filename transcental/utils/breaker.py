@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import threading
+from time import monotonic
+from time import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, since: float, retry_in: float):
+        super().__init__(f"{name} circuit is open")
+        self.since = since  # unix time the circuit opened
+        self.retry_in = retry_in  # seconds until the next probe is allowed
+
+
+class CircuitBreaker:
+    """Fail fast while a dependency is down.
+
+    After `threshold` consecutive failures the circuit opens and calls raise
+    `CircuitOpenError` immediately. Once `reset_timeout` has passed a single
+    call is let through as a probe (half-open): success closes the circuit,
+    failure opens it again.
+
+    Only exceptions in `trips_on` count as failures, so e.g. Home Assistant
+    rejecting a bad service name doesn't take the whole integration offline.
+    Failures and successes can also be reported directly (`failure()` /
+    `success()`), which is how the Home Assistant websocket thread feeds in,
+    hence the lock.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int,
+        reset_timeout: float,
+        timeout: float | None = None,
+        trips_on: tuple[type[BaseException], ...] = (Exception,),
+    ):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = timeout
+        self.trips_on = trips_on
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trips = 0
+        self.rejected = 0
+        self._retry_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before(self):
+        with self._lock:
+            if self.state == self.OPEN and monotonic() >= self._retry_at:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            if self.state != self.CLOSED:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    self.name,
+                    self.opened_at or time(),
+                    max(0.0, self._retry_at - monotonic()),
+                )
+
+    def success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("%s circuit closed", self.name)
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.threshold
+            ):
+                if self.state == self.CLOSED:
+                    self.opened_at = time()
+                    self.trips += 1
+                    logger.warning(
+                        "%s circuit opened after %d failures",
+                        self.name,
+                        self.failures,
+                    )
+                self.state = self.OPEN
+                self._retry_at = monotonic() + self.reset_timeout
+
+    async def call(
+        self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        self.before()
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await fn(*args, **kwargs)
+        except self.trips_on:
+            self.failure()
+            raise
+        except asyncio.CancelledError:
+            with self._lock:
+                self._probing = False
+            raise
+        except Exception:
+            # the dependency answered, just not how we'd like
+            self.success()
+            raise
+        self.success()
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_at": self.opened_at,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
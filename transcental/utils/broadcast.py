@@ -0,0 +1,35 @@
+import asyncio
+import contextlib
+from typing import Any
+from typing import Iterator
+
+
+class Broadcaster:
+    """Fan messages out to every local subscriber.
+
+    Each subscriber gets its own bounded queue. When a slow subscriber's queue is
+    full the oldest message is dropped - consumers only care about the latest
+    state, so a stalled client can't hold memory for everyone else.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        self.maxsize = maxsize
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @contextlib.contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.maxsize)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def publish(self, message: Any):
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
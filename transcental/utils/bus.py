@@ -0,0 +1,322 @@
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import signal
+import zlib
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+from typing import Callable
+
+from transcental.config import config
+
+logger = logging.getLogger(__name__)
+
+OnMessage = Callable[[dict[str, Any]], None]
+OnElected = Callable[[], None]
+
+
+class Bus(ABC):
+    """Carries state snapshots from the process that owns the Home Assistant
+    subscription (the leader) to every worker, the leader included.
+
+    Any worker can also `broadcast` a one-off message (e.g. a config reload)
+    to all the others; those arrive through `on_message` too, but don't
+    replace the snapshot sent to followers that (re)connect.
+
+    `on_elected` is called at most once per process, when it becomes leader.
+    """
+
+    leader: bool = False
+
+    @abstractmethod
+    async def start(self, on_message: OnMessage, on_elected: OnElected): ...
+
+    @abstractmethod
+    async def publish(self, message: dict[str, Any]): ...
+
+    @abstractmethod
+    async def broadcast(self, message: dict[str, Any]): ...
+
+    async def close(self):
+        pass
+
+    def _elect(self):
+        if not self.leader:
+            self.leader = True
+            logger.info("Elected leader on %s", type(self).__name__)
+            self._on_elected()
+
+    def _depose(self):
+        # The leader's work (Home Assistant subscription, scheduler, Socket
+        # Mode) can't be handed back piecemeal, so shut down cleanly and let
+        # the supervisor (uvicorn restarts dead workers) bring this process
+        # back as a follower.
+        logger.error(
+            "Another process took over as leader on %s; restarting",
+            type(self).__name__,
+        )
+        os.kill(os.getpid(), signal.SIGTERM)
+
+
+class LocalBus(Bus):
+    """Single-process bus: always the leader, delivers straight to itself."""
+
+    async def start(self, on_message: OnMessage, on_elected: OnElected):
+        self._on_message = on_message
+        self._on_elected = on_elected
+        self._elect()
+
+    async def publish(self, message: dict[str, Any]):
+        self._on_message(message)
+
+    async def broadcast(self, message: dict[str, Any]):
+        pass  # there are no other workers
+
+
+class SocketBus(Bus):
+    """Workers on one host, over a unix socket.
+
+    Leadership is an exclusive `flock` on `<path>.lock`, which the kernel drops
+    when the owner dies. The leader serves newline-delimited JSON on `path`;
+    followers read from it and retry the lock whenever the leader goes away.
+    Followers broadcast by writing to the leader, which passes the message on.
+    """
+
+    # drop followers that stop reading instead of buffering for them forever
+    MAX_BUFFERED = 1 << 20
+
+    def __init__(self, path: str, retry: float):
+        self.path = path
+        self.retry = retry
+        self._lock_fd: int | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._followers: set[asyncio.StreamWriter] = set()
+        self._last: bytes | None = None
+        self._task: asyncio.Task | None = None
+        self._leader_writer: asyncio.StreamWriter | None = None
+
+    async def start(self, on_message: OnMessage, on_elected: OnElected):
+        self._on_message = on_message
+        self._on_elected = on_elected
+        self._task = asyncio.create_task(self._run())
+
+    def _try_lock(self) -> bool:
+        fd = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _run(self):
+        while True:
+            if self._try_lock():
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(self.path)
+                self._server = await asyncio.start_unix_server(self._serve, self.path)
+                self._elect()
+                return
+            with contextlib.suppress(OSError):
+                await self._follow()
+            await asyncio.sleep(self.retry)
+
+    async def _follow(self):
+        reader, writer = await asyncio.open_unix_connection(self.path, limit=1 << 24)
+        logger.info("Following leader on %s", self.path)
+        self._leader_writer = writer
+        try:
+            while line := await reader.readline():
+                self._on_message(json.loads(line))
+        finally:
+            self._leader_writer = None
+            writer.close()
+        logger.warning("Lost leader on %s", self.path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._followers.add(writer)
+        if self._last is not None:
+            writer.write(self._last)
+        try:
+            while line := await reader.readline():
+                # a follower's broadcast: for us and the other followers
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.warning("Ignoring malformed broadcast from a follower")
+                    continue
+                self._on_message(message)
+                self._fan_out(line, skip=writer)
+        finally:
+            self._followers.discard(writer)
+            writer.close()
+
+    async def publish(self, message: dict[str, Any]):
+        line = (json.dumps(message) + "\n").encode()
+        self._last = line
+        self._on_message(message)
+        self._fan_out(line)
+
+    async def broadcast(self, message: dict[str, Any]):
+        line = (json.dumps(message) + "\n").encode()
+        if self.leader:
+            self._fan_out(line)
+        elif self._leader_writer is not None:
+            self._leader_writer.write(line)
+        else:
+            logger.warning("No leader on %s to broadcast through", self.path)
+
+    def _fan_out(self, line: bytes, skip: asyncio.StreamWriter | None = None):
+        for writer in list(self._followers):
+            if writer is skip:
+                continue
+            if writer.transport.get_write_buffer_size() > self.MAX_BUFFERED:
+                logger.warning("Dropping follower that stopped reading")
+                self._followers.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        for writer in list(self._followers):
+            writer.close()
+        if self._server:
+            self._server.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+
+
+class PostgresBus(Bus):
+    """Workers on any number of hosts, over LISTEN/NOTIFY on the app database.
+
+    Leadership is a session-level advisory lock, released by Postgres when the
+    leader's connection dies. Followers ask for a resend on (re)connect so they
+    don't wait for the next change to get the current state.
+
+    NOTIFY payloads must be under 8000 bytes, so each message goes out as
+    numbered "<index>/<count>:" parts in one transaction, which Postgres
+    delivers together and in order, and followers join them back up.
+    """
+
+    SYNC = "sync"
+    PART_SIZE = 7000  # json.dumps output is ASCII, so characters are bytes
+
+    def __init__(self, dsn: str, channel: str, retry: float):
+        self.dsn = dsn
+        self.channel = channel
+        self.retry = retry
+        self._lock_key = zlib.crc32(channel.encode())
+        self._conn = None
+        self._query_lock = asyncio.Lock()
+        self._last: list[str] | None = None
+        self._task: asyncio.Task | None = None
+        self._resends: set[asyncio.Task] = set()
+        self._partial: dict[int, list[str]] = {}  # sender pid -> parts so far
+
+    async def start(self, on_message: OnMessage, on_elected: OnElected):
+        self._on_message = on_message
+        self._on_elected = on_elected
+        self._task = asyncio.create_task(self._run())
+
+    async def _query(self, sql: str, *args):
+        async with self._query_lock:
+            return await self._conn.fetchval(sql, *args)
+
+    async def _notify(self, *payloads: str):
+        if self._conn is None or self._conn.is_closed():
+            return
+        async with self._query_lock, self._conn.transaction():
+            for payload in payloads:
+                await self._conn.execute(
+                    "SELECT pg_notify($1, $2)", self.channel, payload
+                )
+
+    def _split(self, payload: str) -> list[str]:
+        chunks = [
+            payload[i : i + self.PART_SIZE]
+            for i in range(0, len(payload), self.PART_SIZE)
+        ]
+        return [f"{i}/{len(chunks)}:{chunk}" for i, chunk in enumerate(chunks)]
+
+    async def _run(self):
+        import asyncpg
+
+        while True:
+            try:
+                self._conn = await asyncpg.connect(self.dsn)
+                await self._conn.add_listener(self.channel, self._notified)
+                if not self.leader:
+                    await self._notify(self.SYNC)
+                locked = False
+                while not self._conn.is_closed():
+                    if not locked:
+                        locked = await self._query(
+                            "SELECT pg_try_advisory_lock($1)", self._lock_key
+                        )
+                        if locked:
+                            self._elect()
+                        elif self.leader:
+                            # our connection dropped and someone else took over
+                            self._depose()
+                            return
+                    await asyncio.sleep(self.retry)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                logger.warning("State bus connection failed, retrying", exc_info=True)
+            await asyncio.sleep(self.retry)
+
+    def _notified(self, conn, pid: int, channel: str, payload: str):
+        if pid == conn.get_server_pid():
+            return  # our own publish, already applied locally
+        if payload == self.SYNC:
+            if self.leader and self._last is not None:
+                task = asyncio.create_task(self._notify(*self._last))
+                self._resends.add(task)
+                task.add_done_callback(self._resends.discard)
+            return
+        header, _, chunk = payload.partition(":")
+        index, _, count = header.partition("/")
+        parts = self._partial.setdefault(pid, [])
+        if index == "0":
+            parts.clear()
+        parts.append(chunk)
+        if int(index) + 1 == int(count):
+            del self._partial[pid]
+            self._on_message(json.loads("".join(parts)))
+
+    async def publish(self, message: dict[str, Any]):
+        parts = self._split(json.dumps(message))
+        self._last = parts
+        self._on_message(message)
+        await self._notify(*parts)
+
+    async def broadcast(self, message: dict[str, Any]):
+        await self._notify(*self._split(json.dumps(message)))
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        if self._conn is not None:
+            await self._conn.close()
+
+
+def create_bus() -> Bus:
+    match config.bus.backend:
+        case "socket":
+            return SocketBus(config.bus.socket_path, config.bus.retry)
+        case "postgres":
+            return PostgresBus(
+                config.database_url.encoded_string(),
+                config.bus.channel,
+                config.bus.retry,
+            )
+        case _:
+            return LocalBus()
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from time import perf_counter
+from typing import Any
+
+from piccolo.engine import engine_finder
+from piccolo.engine.postgres import PostgresEngine
+
+from transcental.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def hot_queries() -> list[tuple[str, list[Any]]]:
+    """Queries worth having prepared on every pooled connection up front.
+
+    asyncpg caches prepared statements per connection, keyed by SQL text, so
+    these must compile to exactly what the app runs later.
+    """
+    from transcental.utils.audit import history_query
+
+    return [
+        querystring.compile_string(engine_type="postgres")
+        for querystring in history_query().querystrings
+    ]
+
+
+class Database:
+    """Owns the Piccolo engine's asyncpg pool for the life of the app.
+
+    Without a pool Piccolo opens a new connection for every query. If the
+    database is unreachable at startup we log and carry on without one,
+    since the database only backs optional features like the audit log.
+    """
+
+    def __init__(self):
+        self.engine: PostgresEngine | None = None
+        self.warm_up_seconds: float | None = None
+
+    async def start(self):
+        # Piccolo connects synchronously the first time the engine is looked
+        # up, so do that off the event loop.
+        self.engine = await asyncio.to_thread(engine_finder)
+        if not isinstance(self.engine, PostgresEngine):
+            logger.info("Not pooling %s", type(self.engine).__name__)
+            return
+        try:
+            await asyncio.wait_for(
+                self.engine.start_connection_pool(
+                    min_size=config.database.pool_min,
+                    max_size=config.database.pool_max,
+                    statement_cache_size=config.database.statement_cache_size,
+                    max_cached_statement_lifetime=config.database.statement_lifetime,
+                    command_timeout=config.database.command_timeout,
+                ),
+                config.database.connect_timeout,
+            )
+        except Exception as exc:
+            logger.warning("Database pool unavailable, connecting per query: %r", exc)
+            self.engine.pool = None
+            return
+        await self.warm_up()
+
+    async def warm_up(self):
+        """Check out every idle connection at once and prepare the hot
+        queries on each, so the first real requests don't pay for it."""
+        pool = self.engine.pool
+        st = perf_counter()
+        queries = hot_queries()
+
+        async def prime():
+            async with pool.acquire() as conn:
+                for sql, args in queries:
+                    await conn.fetch(sql, *args)
+
+        results = await asyncio.gather(
+            *(prime() for _ in range(pool.get_idle_size())), return_exceptions=True
+        )
+        if failed := [r for r in results if isinstance(r, Exception)]:
+            # e.g. migrations haven't run yet; the pool itself is still fine
+            logger.warning("Database warm-up failed: %r", failed[0])
+        self.warm_up_seconds = perf_counter() - st
+        logger.info(
+            "Database pool ready (%d connections) in %.02fs",
+            pool.get_size(),
+            self.warm_up_seconds,
+        )
+
+    async def close(self):
+        if self.engine is not None and self.engine.pool is not None:
+            await self.engine.close_connection_pool()
+
+    def stats(self) -> dict[str, Any]:
+        pool = self.engine.pool if self.engine is not None else None
+        if pool is None:
+            return {"pooled": False}
+        return {
+            "pooled": True,
+            "size": pool.get_size(),
+            "idle": pool.get_idle_size(),
+            "in_use": pool.get_size() - pool.get_idle_size(),
+            "min": pool.get_min_size(),
+            "max": pool.get_max_size(),
+            "warm_up_seconds": self.warm_up_seconds,
+        }
@@ -0,0 +1,65 @@
+import json
+from collections import OrderedDict
+from time import monotonic
+from urllib.parse import parse_qs
+
+
+class DedupCache:
+    """Bounded set of recently seen keys, evicted by age and then by size.
+
+    Every key lives for the same TTL, so insertion order is also expiry order
+    and eviction only ever has to look at the oldest entries.
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._seen: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _evict(self, now: float):
+        while self._seen:
+            key, expires = next(iter(self._seen.items()))
+            if expires > now:
+                break
+            del self._seen[key]
+
+    def check(self, key: str) -> bool:
+        """Record `key` and return True if it was already seen within the TTL."""
+        now = monotonic()
+        self._evict(now)
+        if key in self._seen:
+            return True
+        self._seen[key] = now + self.ttl
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return False
+
+
+def delivery_key(body: bytes, content_type: str) -> str | None:
+    """Extract a stable id for a Slack delivery so retries can be recognised.
+
+    Supported payloads:
+    - Events API callbacks (JSON) -> `event_id`
+    - interactivity payloads (form-encoded `payload` JSON) -> `trigger_id`
+    - slash commands (form-encoded) -> `trigger_id`
+
+    Returns None for anything without a usable id (e.g. url_verification).
+    """
+    try:
+        if content_type.startswith("application/json"):
+            data = json.loads(body)
+            event_id = data.get("event_id") if isinstance(data, dict) else None
+            return f"event:{event_id}" if event_id else None
+
+        form = parse_qs(body.decode("utf-8"))
+        if "payload" in form:
+            data = json.loads(form["payload"][0])
+            trigger_id = data.get("trigger_id") if isinstance(data, dict) else None
+        else:
+            trigger_id = form.get("trigger_id", [None])[0]
+        return f"trigger:{trigger_id}" if trigger_id else None
+    except (ValueError, UnicodeDecodeError):
+        return None
@@ -1,54 +1,87 @@
 import logging
+from threading import Event
 
 from homeassistant_api import WebsocketClient
 
-from transcental.cache import cache
-
-
-def update_light(ws_client: WebsocketClient, env):
-    with ws_client as client:
-        light = client.get_entity(entity_id="light.bedroom")
-        if light:
-            state = light.state
-            attributes = state.attributes
-            rgb = attributes.get("rgb_color", (255, 255, 255))
-            brightness = attributes.get("brightness", 255)
-            temperature = attributes.get("color_temp", 4000)
-            is_on = state.state == "on"
-            cache.light_colour = f"rgb({rgb[0]},{rgb[1]},{rgb[2]})"
-            cache.light_brightness = int((brightness / 255) * 100)
-            cache.light_temperature = temperature
-            cache.light_on = is_on
-
-        with client.listen_events("state_changed") as events:
-            for event in events:
-                if event.data["entity_id"] == "light.bedroom":
-                    logging.info("Light state changed event received")
-                    rgb = (
-                        event.data["new_state"]
-                        .get("attributes", {})
-                        .get("rgb_color", (255, 255, 255))
-                    )
-                    brightness = (
-                        event.data["new_state"]
-                        .get("attributes", {})
-                        .get("brightness", 255)
-                    )
-                    temperature = (
-                        event.data["new_state"]
-                        .get("attributes", {})
-                        .get("color_temp", 4000)
-                    )
-                    is_on = event.data["new_state"].get("state", "off") == "on"
-                    cache.light_colour = f"rgb({rgb[0]},{rgb[1]},{rgb[2]})"
-                    cache.light_brightness = int((brightness / 255) * 100)
-                    cache.light_temperature = temperature
-                    cache.light_on = is_on
-                    logging.info(f"Cache updated: {cache}")
-
-                    try:
-                        env.loop.call_soon_threadsafe(
-                            env.update_queue.put_nowait, "light_update"
-                        )
-                    except Exception as e:
-                        logging.error(f"Failed to put update in queue: {e}")
+from transcental.config import config
+from transcental.domains import handler_for
+
+logger = logging.getLogger(__name__)
+
+
+RECONNECT_MIN = 1.0
+
+
+def update_light(ws_client: WebsocketClient, env, stop: Event):
+    """Mirror the configured entities into the cache until `stop` is set,
+    reconnecting with backoff whenever Home Assistant goes away."""
+    backoff = RECONNECT_MIN
+    while not stop.is_set():
+        try:
+            with ws_client as client:
+                env.home_breaker.success()
+                backoff = RECONNECT_MIN
+                _follow_entities(client, env)
+            logger.warning("Home Assistant websocket closed")
+        except Exception as exc:
+            if stop.is_set():
+                break
+            env.home_breaker.failure()
+            logger.warning("Home Assistant websocket failed: %r", exc)
+        if stop.is_set():
+            break
+        env.loop.call_soon_threadsafe(env.mark_stale)
+        logger.info("Reconnecting to Home Assistant in %.0fs", backoff)
+        stop.wait(backoff)
+        backoff = min(backoff * 2, config.home_assistant.reconnect_max)
+    logger.debug("Stopped following Home Assistant")
+
+
+def stop_following(ws_client: WebsocketClient, stop: Event):
+    """Ask the update_light thread to finish. Closing the connection wakes it
+    if it's blocked waiting for the next event (the sync websockets client
+    allows closing from another thread)."""
+    stop.set()
+    conn = ws_client._conn
+    if conn is not None:
+        conn.close()
+
+
+def _follow_entities(client: WebsocketClient, env):
+    # States are encoded here but only ever written to the cache on the loop,
+    # which also replaces it whenever a bus snapshot arrives.
+    mirrored = env.mirrored
+    states = {
+        state.entity_id: handler_for(state.entity_id).encode(
+            state.state, state.attributes
+        )
+        for state in client.get_states()
+        if state.entity_id in mirrored
+    }
+    if missing := mirrored - states.keys():
+        # get_entity would raise for these and drop us into a reconnect loop
+        logger.warning(
+            "Mirrored entities not found in Home Assistant: %s",
+            ", ".join(sorted(missing)),
+        )
+    env.loop.call_soon_threadsafe(env.load_states, states)
+
+    with client.listen_events("state_changed") as events:
+        for event in events:
+            entity_id = event.data["entity_id"]
+            # re-read per event: a config reload can change the set
+            if entity_id not in env.mirrored:
+                continue
+            new_state = event.data["new_state"] or {}
+            state = handler_for(entity_id).encode(
+                new_state.get("state", "off"), new_state.get("attributes", {})
+            )
+            logger.debug(
+                "Entity state changed",
+                extra={"entity_id": entity_id, "state": state},
+            )
+
+            try:
+                env.loop.call_soon_threadsafe(env.publish_state, entity_id, state)
+            except Exception as e:
+                logger.error("Failed to publish state update: %s", e)
@@ -0,0 +1,25 @@
+import re
+
+# a whole JSON string (escapes included) or a single bracket; everything else
+# is skipped, so brackets inside strings don't count towards the depth
+_JSON_NESTING_RE = re.compile(r'"(?:[^"\\]|\\.)*"?|[\[\]{}]', re.S)
+
+
+def check_json(text: str, max_size: int, max_depth: int):
+    """Raise ValueError if `text` is too big or nests too deeply to be worth
+    handing to `json.loads`.
+
+    The size check is O(1) and comes first; the depth check is one regex pass
+    over what's left and stops at the first bracket past the limit.
+    """
+    if len(text) > max_size:
+        raise ValueError(f"too long ({len(text)} characters, the limit is {max_size})")
+    depth = 0
+    for m in _JSON_NESTING_RE.finditer(text):
+        char = m.group()[0]
+        if char in "[{":
+            depth += 1
+            if depth > max_depth:
+                raise ValueError(f"nested too deeply (the limit is {max_depth})")
+        elif char in "]}":
+            depth -= 1
@@ -1,8 +1,178 @@
+import atexit
+import json
+import logging.handlers
+import queue
+import random
+from time import monotonic
 from typing import Optional
 
 from slack_sdk.web.async_client import AsyncWebClient
 
 from transcental.config import config
+from transcental.utils.tracing import tracer
+
+# attributes every LogRecord has; anything else came from `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any `extra=` fields as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() runs the full formatter on the calling thread and
+        # folds the traceback into the message. Only resolve what can't safely
+        # cross threads (args, traceback frames) and leave formatting to the
+        # listener.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG/INFO records for the configured loggers.
+
+    `rates` maps a logger name (and its children) to the fraction to keep.
+    Warnings and above always pass.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            parts = name.split(".")
+            for i in range(len(parts), 0, -1):
+                prefix = ".".join(parts[:i])
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Cap how often the same call site (logger + message template) can log.
+
+    Each call site gets a bucket of `burst` records refilled at `per_second`.
+    Dropped records are counted and reported as `suppressed` on the next one
+    that gets through.
+    """
+
+    def __init__(self, per_second: float, burst: int = 10, max_sites: int = 4096):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self.max_sites = max_sites
+        # (logger, template) -> [tokens, last refill, suppressed]
+        self._buckets: dict[tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.per_second <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_sites:
+                self._buckets.clear()
+            bucket = self._buckets[key] = [float(self.burst), now, 0]
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+        bucket[0] -= 1
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+
+# the running writer thread and the per-logger levels it was configured with,
+# so configure_logging can be called again when the config is reloaded
+_listener: logging.handlers.QueueListener | None = None
+_levels: dict[str, str] = {}
+
+
+def configure_logging():
+    """Route all logging through a queue to a background writer thread.
+
+    Records are filtered (level, sampling, rate limit) on the calling thread
+    before anything is formatted, so disabled or dropped messages cost close to
+    nothing; formatting and I/O happen on the listener thread.
+    """
+    global _listener, _levels
+    settings = config.logging
+    level = settings.level or (
+        "DEBUG" if config.environment != "production" else "INFO"
+    )
+
+    stream = logging.StreamHandler()
+    if settings.format == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    if settings.sample:
+        handler.addFilter(SamplingFilter(settings.sample))
+    if settings.rate_limit > 0:
+        handler.addFilter(RateLimitFilter(settings.rate_limit, settings.rate_burst))
+
+    listener = logging.handlers.QueueListener(
+        records, stream, respect_handler_level=True
+    )
+    listener.start()
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    for name in _levels.keys() - settings.levels.keys():
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    for name, logger_level in settings.levels.items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+
+    if _listener is not None:
+        # writes out whatever the old handler had already queued
+        _listener.stop()
+        atexit.unregister(_listener.stop)
+    atexit.register(listener.stop)
+    _listener, _levels = listener, dict(settings.levels)
 
 
 async def send_heartbeat(
@@ -21,11 +191,12 @@ async def send_heartbeat(
     if config.slack.heartbeat_channel:
         if not channel:
             channel = config.slack.heartbeat_channel
-        msg = await client.chat_postMessage(channel=channel, text=heartbeat)
-        if messages:
-            for message in messages:
-                await client.chat_postMessage(
-                    channel=channel,
-                    text=message,
-                    thread_ts=msg["ts"],
-                )
+        with tracer.span("slack.heartbeat", messages=len(messages) + 1):
+            msg = await client.chat_postMessage(channel=channel, text=heartbeat)
+            if messages:
+                for message in messages:
+                    await client.chat_postMessage(
+                        channel=channel,
+                        text=message,
+                        thread_ts=msg["ts"],
+                    )
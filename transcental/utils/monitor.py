@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import sys
+import threading
+import traceback
+from collections import Counter
+from collections import deque
+from time import monotonic
+from time import time
+from typing import Any
+
+from transcental.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """Measures event loop lag and catches whatever is blocking it.
+
+    A task sleeps for `interval` over and over; how late it wakes up is the
+    lag. A watchdog thread notices when that task has gone quiet for longer
+    than `interval + threshold` and grabs the loop thread's stack right then,
+    while the blocking call is still on it. This works the same on uvloop,
+    which ignores asyncio's debug-mode slow callback warnings.
+    """
+
+    def __init__(self, interval: float, threshold: float, stalls: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags: deque[float] = deque(maxlen=max(1, int(60 / interval)))
+        self.stalls: deque[dict[str, Any]] = deque(maxlen=stalls)
+        self.stall_count = 0
+        self._beat = monotonic()
+        self._stalled: dict[str, Any] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if not config.monitor.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = monotonic()
+        self._task = asyncio.create_task(self._sample())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def set_interval(self, interval: float):
+        """Change how often the loop is sampled. The lag window starts over,
+        since the samples already taken were spaced at the old interval."""
+        self.interval = interval
+        self.lags = deque(maxlen=max(1, int(60 / interval)))
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _sample(self):
+        while True:
+            started = monotonic()
+            await asyncio.sleep(self.interval)
+            self._beat = now = monotonic()
+            lag = max(0.0, now - started - self.interval)
+            self.lags.append(lag)
+            if self._stalled is not None:
+                # the watchdog caught this one mid-stall; now we know how long it was
+                self._stalled["seconds"] = round(lag, 3)
+                logger.warning(
+                    "Event loop blocked for %.0fms in:\n%s",
+                    lag * 1000,
+                    self._stalled["stack"],
+                )
+                self._stalled = None
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            blocked = monotonic() - self._beat - self.interval
+            if blocked < self.threshold or self._stalled is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stall = {
+                "at": time(),
+                "seconds": round(blocked, 3),
+                "stack": "".join(traceback.format_stack(frame)),
+            }
+            self.stall_count += 1
+            self.stalls.append(stall)
+            self._stalled = stall
+
+    def tasks(self) -> dict[str, Any]:
+        tasks = asyncio.all_tasks(self._loop) if self._loop else set()
+        kinds = Counter(
+            getattr(task.get_coro(), "__qualname__", type(task.get_coro()).__name__)
+            for task in tasks
+        )
+        return {"total": len(tasks), "top": dict(kinds.most_common(10))}
+
+    def stats(self) -> dict[str, Any]:
+        if self._task is None:
+            return {"enabled": False}
+        lags = sorted(self.lags) or [0.0]
+        last = self.lags[-1] if self.lags else 0.0
+
+        def pct(p: float) -> float:
+            return round(lags[min(len(lags) - 1, int(p * len(lags)))] * 1000, 2)
+
+        return {
+            "enabled": True,
+            "lag_ms": {
+                "last": round(last * 1000, 2),
+                "p50": pct(0.5),
+                "p99": pct(0.99),
+                "max": round(lags[-1] * 1000, 2),
+                "window_seconds": round(len(self.lags) * self.interval, 1),
+            },
+            "tasks": self.tasks(),
+            "threshold_ms": self.threshold * 1000,
+            "stall_count": self.stall_count,
+            "stalls": list(self.stalls),
+        }
+
+
+monitor = LoopMonitor(
+    config.monitor.interval, config.monitor.threshold, config.monitor.stalls
+)
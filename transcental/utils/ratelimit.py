@@ -0,0 +1,28 @@
+from collections import OrderedDict
+from time import monotonic
+
+
+class KeyedThrottle:
+    """Allow at most one hit per `interval` seconds for each key.
+
+    Keys are kept in least-recently-allowed order and capped at `max_keys`, so a
+    flood of distinct keys can't grow the table without bound.
+    """
+
+    def __init__(self, interval: float, max_keys: int = 1024):
+        self.interval = interval
+        self.max_keys = max_keys
+        self._last: OrderedDict[str, float] = OrderedDict()
+
+    def allow(self, key: str) -> bool:
+        if self.interval <= 0:
+            return True
+        now = monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            return False
+        self._last[key] = now
+        self._last.move_to_end(key)
+        if len(self._last) > self.max_keys:
+            self._last.popitem(last=False)
+        return True
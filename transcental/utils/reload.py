@@ -0,0 +1,143 @@
+import asyncio
+import inspect
+import logging
+from typing import Any
+from typing import Callable
+
+from pydantic import BaseModel
+
+from transcental.config import Config
+from transcental.config import config
+
+logger = logging.getLogger(__name__)
+
+# Settings that are only read while starting up (credentials, connections,
+# sizes of things already allocated). A reload reports them but leaves the
+# running values alone, so nothing ends up half-switched.
+RESTART_ONLY = (
+    "slack.bot_token",
+    "slack.signing_secret",
+    "slack.app_token",
+    "slack.api_url",
+    "slack.transport",
+    "slack.socket_connections",
+    "starlette",
+    "home_assistant.url",
+    "home_assistant.token",
+    "database_url",
+    "database",
+    "environment",
+    "timezone",
+    "port",
+    "workers",
+    "bus",
+    "audit",
+    "websocket.replay",
+    "monitor.enabled",
+    "monitor.stalls",
+    "shutdown",  # uvicorn's graceful shutdown timeout is fixed when it starts
+)
+
+Watcher = Callable[[set[str]], Any]
+
+
+def _matches(key: str, prefix: str) -> bool:
+    return key == prefix or key.startswith(prefix + ".")
+
+
+def _flatten(settings: Config) -> dict[str, Any]:
+    """`section.field` -> value, one level deep (dict settings compare whole)."""
+    out: dict[str, Any] = {}
+    for name in type(settings).model_fields:
+        value = getattr(settings, name)
+        if isinstance(value, BaseModel):
+            for field in type(value).model_fields:
+                out[f"{name}.{field}"] = getattr(value, field)
+        else:
+            out[name] = value
+    return out
+
+
+class ConfigReloader:
+    """Re-reads `.env` and the environment into the live `config`.
+
+    Everything imports the same `config` object, so a reload replaces its
+    sections in place, all in one step with nothing awaited in between. Code
+    that reads settings as it goes (whitelist and heartbeat channels, the
+    API token, tracing sampling...) sees the new values straight away.
+    Subsystems that copied settings when they started register a watcher for
+    their section and are only called when something under it changed.
+    """
+
+    def __init__(self):
+        self._watchers: list[tuple[tuple[str, ...], Watcher]] = []
+        self._lock = asyncio.Lock()
+
+    def watch(self, prefixes: str | tuple[str, ...], callback: Watcher):
+        """Call `callback(changed_keys)` (sync or async) once after a reload
+        that changed anything under `prefixes`, e.g. "logging" or
+        ("websocket", "monitor")."""
+        if isinstance(prefixes, str):
+            prefixes = (prefixes,)
+        self._watchers.append((prefixes, callback))
+
+    async def reload(self) -> tuple[list[str], list[str]]:
+        """Returns the settings applied and those waiting for a restart.
+
+        Raises pydantic's ValidationError, leaving the config untouched, if
+        the new settings are invalid.
+        """
+        async with self._lock:
+            fresh = await asyncio.to_thread(Config)  # type: ignore[call-arg]
+            old, new = _flatten(config), _flatten(fresh)
+            changed = {key for key in new if old.get(key) != new[key]}
+            restart = {
+                key
+                for key in changed
+                if any(_matches(key, prefix) for prefix in RESTART_ONLY)
+            }
+            applied = changed - restart
+
+            sections: dict[str, Any] = {}
+            for key in applied:
+                name, _, field = key.partition(".")
+                if field:
+                    sections.setdefault(name, {})[field] = getattr(
+                        getattr(fresh, name), field
+                    )
+                else:
+                    sections[name] = getattr(fresh, name)
+            replacements = {
+                name: getattr(config, name).model_copy(update=value)
+                if isinstance(value, dict)
+                and isinstance(getattr(config, name), BaseModel)
+                else value
+                for name, value in sections.items()
+            }
+            for name, value in replacements.items():
+                setattr(config, name, value)
+
+            if applied:
+                logger.info("Config reloaded: %s", ", ".join(sorted(applied)))
+            if restart:
+                logger.warning(
+                    "Config changes that need a restart: %s", ", ".join(sorted(restart))
+                )
+            for prefixes, callback in self._watchers:
+                keys = {
+                    key
+                    for key in applied
+                    if any(_matches(key, prefix) for prefix in prefixes)
+                }
+                if not keys:
+                    continue
+                try:
+                    result = callback(keys)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception:
+                    logger.exception("Failed to apply reloaded %s", ", ".join(keys))
+            return sorted(applied), sorted(restart)
+
+
+reloader = ConfigReloader()
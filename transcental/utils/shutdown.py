@@ -0,0 +1,55 @@
+import asyncio
+import functools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InFlight:
+    """Slack listeners that are still running, so shutdown can let them finish.
+
+    Bolt acks and then runs listeners in tasks of their own, long after the
+    request (or Socket Mode envelope) that started them has been answered, so
+    uvicorn knows nothing about them.
+    """
+
+    def __init__(self):
+        self.accepting = True
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def track(self, fn):
+        """Wrap a Bolt listener; like `traced`, keeps its signature visible."""
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            task = asyncio.current_task()
+            self._tasks.add(task)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self._tasks.discard(task)
+
+        return wrapper
+
+    async def drain(self, timeout: float):
+        """Wait up to `timeout` for running listeners, then cancel the rest."""
+        self.accepting = False
+        if not self._tasks:
+            return
+        logger.info("Waiting for %d in-flight handlers", len(self))
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            logger.warning(
+                "Cancelling %d handlers still running after %.0fs",
+                len(pending),
+                timeout,
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+inflight = InFlight()
@@ -0,0 +1,237 @@
+import asyncio
+import contextlib
+import json
+import logging
+from collections import deque
+from time import monotonic
+from time import time
+from typing import Any
+from typing import AsyncIterator
+
+from starlette.websockets import WebSocket
+from starlette.websockets import WebSocketDisconnect
+
+from transcental.cache import cache
+from transcental.utils.broadcast import Broadcaster
+
+logger = logging.getLogger(__name__)
+
+# close codes; 4xxx are ours
+GOING_AWAY = 1001
+TRY_AGAIN_LATER = 1013
+IDLE = 4000
+TOO_SLOW = 4001
+
+_WAKE = object()
+
+
+class _Connection:
+    __slots__ = ("queue", "last_seen", "gone")
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+        self.last_seen = monotonic()
+        self.gone = False
+
+    def wake(self):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_WAKE)
+
+
+class SocketHub:
+    """Serves /ws dashboards and /events (SSE) streams from the shared update
+    stream; both count towards the same cap and are drained together.
+
+    Each connection has a reader that notices disconnects and records when the
+    client last spoke, and a writer that pushes state plus an application-level
+    `{"type": "ping"}` every `ping_interval`. Clients answer with anything (the page sends `{"type": "pong"}`); ones that go
+    quiet for `idle_timeout` are closed, as are ones that can't take a send
+    within `send_timeout`, so a sleeping phone doesn't pin a coroutine.
+
+    The last `replay` states are kept, keyed by version, so an SSE client
+    reconnecting with `Last-Event-ID` gets exactly what it missed.
+    """
+
+    def __init__(
+        self,
+        updates: Broadcaster,
+        max_connections: int,
+        ping_interval: float,
+        idle_timeout: float,
+        send_timeout: float,
+        replay: int,
+    ):
+        self.updates = updates
+        self.max_connections = max_connections
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.send_timeout = send_timeout
+        self.draining = False
+        self.rejected = 0
+        self.evicted = {"idle": 0, "slow": 0}
+        self._connections: set[_Connection] = set()
+        self._history: deque[tuple[int, str]] = deque(maxlen=replay)
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    @property
+    def full(self) -> bool:
+        return self.draining or len(self._connections) >= self.max_connections
+
+    def record(self):
+        """Remember the state just loaded into the cache for replay."""
+        self._history.append((cache.version, json.dumps(cache.snapshot(public=True))))
+
+    def _since(self, last: int | None) -> list[tuple[int, str]]:
+        if last is not None and self._history and last >= self._history[0][0]:
+            return [entry for entry in self._history if entry[0] > last]
+        # unknown or too old to replay: the current state says it all
+        return [(cache.version, json.dumps(cache.snapshot(public=True)))]
+
+    async def serve(self, websocket: WebSocket):
+        await websocket.accept()
+        if self.full:
+            self.rejected += 1
+            await websocket.close(TRY_AGAIN_LATER, "server busy")
+            return
+
+        with self.updates.subscribe() as queue:
+            conn = _Connection(queue)
+            self._connections.add(conn)
+            reader = asyncio.create_task(self._read(websocket, conn))
+            try:
+                await self._write(websocket, conn)
+            except (WebSocketDisconnect, RuntimeError, OSError):
+                pass  # the peer went away mid-send
+            finally:
+                self._connections.discard(conn)
+                reader.cancel()
+
+    async def _read(self, websocket: WebSocket, conn: _Connection):
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                conn.last_seen = monotonic()
+        except Exception:
+            pass
+        conn.gone = True
+        conn.wake()
+
+    async def _send(self, websocket: WebSocket, data: Any) -> bool:
+        try:
+            async with asyncio.timeout(self.send_timeout):
+                await websocket.send_json(data)
+        except TimeoutError:
+            self.evicted["slow"] += 1
+            await self._close(websocket, TOO_SLOW, "too slow")
+            return False
+        return True
+
+    async def _close(self, websocket: WebSocket, code: int, reason: str):
+        # the peer may already be gone or wedged; don't wait on it
+        with contextlib.suppress(Exception):
+            async with asyncio.timeout(1):
+                await websocket.close(code, reason)
+
+    async def _write(self, websocket: WebSocket, conn: _Connection):
+        if not await self._send(websocket, cache.snapshot(public=True)):
+            return
+        next_ping = monotonic() + self.ping_interval
+        while True:
+            try:
+                async with asyncio.timeout(max(0.0, next_ping - monotonic())):
+                    payload = await conn.queue.get()
+            except TimeoutError:
+                payload = None
+
+            if conn.gone:
+                return
+            if self.draining:
+                await self._close(websocket, GOING_AWAY, "server shutting down")
+                return
+
+            now = monotonic()
+            if now - conn.last_seen > self.idle_timeout:
+                self.evicted["idle"] += 1
+                await self._close(websocket, IDLE, "idle")
+                return
+            if payload == "light_update":
+                if not await self._send(websocket, cache.snapshot(public=True)):
+                    return
+            # pings go out even under a steady stream of updates, since only
+            # the client's replies prove it's still there
+            if now >= next_ping:
+                if not await self._send(websocket, {"type": "ping", "t": time()}):
+                    return
+                next_ping = now + self.ping_interval
+
+    async def events(self, last_event_id: str | None) -> AsyncIterator[str]:
+        """Server-Sent Events for one client: missed states (or the current
+        one), then every change, with comment pings to keep proxies open."""
+        try:
+            sent = int(last_event_id) if last_event_id else None
+        except ValueError:
+            sent = None
+        with self.updates.subscribe() as queue:
+            conn = _Connection(queue)
+            self._connections.add(conn)
+            try:
+                yield "retry: 3000\n\n"
+                while True:
+                    for version, data in self._since(sent):
+                        yield f"id: {version}\nevent: state\ndata: {data}\n\n"
+                        sent = version
+                    while True:
+                        try:
+                            async with asyncio.timeout(self.ping_interval):
+                                payload = await queue.get()
+                        except TimeoutError:
+                            yield ": ping\n\n"
+                            continue
+                        if self.draining:
+                            return
+                        if payload == "light_update":
+                            break
+            finally:
+                self._connections.discard(conn)
+
+    async def wait(self, version: int, timeout: float) -> bool:
+        """Long-poll: wait up to `timeout` for the state to move past
+        `version`. Counts towards the cap while waiting, like a stream."""
+        with self.updates.subscribe() as queue:
+            conn = _Connection(queue)
+            self._connections.add(conn)
+            try:
+                async with asyncio.timeout(timeout):
+                    while cache.version == version and not self.draining:
+                        await queue.get()
+            except TimeoutError:
+                pass
+            finally:
+                self._connections.discard(conn)
+        return cache.version != version
+
+    async def drain(self, timeout: float):
+        """Close every connection with "going away" and wait (up to `timeout`)
+        for them to finish; new connections are refused meanwhile."""
+        self.draining = True
+        for conn in list(self._connections):
+            conn.wake()
+        deadline = monotonic() + timeout
+        while self._connections and monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._connections:
+            logger.warning("%d websockets still open after drain", len(self))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "connections": len(self._connections),
+            "max_connections": self.max_connections,
+            "rejected": self.rejected,
+            "evicted": dict(self.evicted),
+            "draining": self.draining,
+        }
@@ -1,21 +1,41 @@
+import asyncio
+import hmac
+import json
 import logging
+from functools import lru_cache
 from pathlib import Path
+from time import perf_counter
+from typing import Any
 
 from slack_bolt.adapter.starlette.async_handler import AsyncSlackRequestHandler
+from slack_sdk.signature import SignatureVerifier
 from starlette.applications import Starlette
 from starlette.requests import Request
 from starlette.responses import JSONResponse
-from starlette.routing import Mount
+from starlette.responses import Response
+from starlette.responses import StreamingResponse
 from starlette.routing import Route
 from starlette.routing import WebSocketRoute
-from starlette.staticfiles import StaticFiles
 from starlette.templating import Jinja2Templates
 from starlette.websockets import WebSocket
-from starlette.websockets import WebSocketDisconnect
 
 from transcental.cache import cache
+from transcental.commands.ha import perform_action
 from transcental.config import config
 from transcental.env import env
+from transcental.utils.audit import audit_history
+from transcental.utils.dedup import DedupCache
+from transcental.utils.dedup import delivery_key
+from transcental.utils.limits import check_json
+from transcental.utils.logging import send_heartbeat
+from transcental.utils.monitor import monitor
+from transcental.utils.reload import reloader
+from transcental.utils.shutdown import inflight
+from transcental.utils.static import CachedTemplate
+from transcental.utils.static import etag_matches
+from transcental.utils.static import StaticAssets
+from transcental.utils.tracing import tracer
+from transcental.utils.transport import transport_stats
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +43,51 @@ req_handler = AsyncSlackRequestHandler(env.app)
 TEMPLATE_DIR = Path(Path.cwd() / config.starlette.directory / "templates")
 STATIC_DIR = Path(Path.cwd() / config.starlette.directory / "static")
 templates = Jinja2Templates(directory=TEMPLATE_DIR)
+static_assets = StaticAssets(STATIC_DIR)
+templates.env.globals["static_url"] = static_assets.url
+index_page = CachedTemplate(
+    templates, "index.html", TEMPLATE_DIR, watch=config.environment != "production"
+)
+signature_verifier = SignatureVerifier(config.slack.signing_secret)
+# per worker: with WORKERS > 1 over HTTP, a retry that lands on a different
+# worker than the original isn't caught (Socket Mode only runs on the leader)
+deliveries = DedupCache(ttl=config.slack.dedup_ttl, max_size=config.slack.dedup_size)
+
+
+def _resize_deliveries(keys: set[str]):
+    deliveries.ttl = config.slack.dedup_ttl
+    deliveries.max_size = config.slack.dedup_size
+
+
+reloader.watch(("slack.dedup_ttl", "slack.dedup_size"), _resize_deliveries)
+# longest a client may hold a /api/state long-poll open, in seconds
+MAX_WAIT = 60.0
+# most operations a single /api/ha/batch request may carry
+MAX_BATCH = 50
+
+
+SHUTTING_DOWN = {"error": "shutting_down"}
 
 
 async def endpoint(req: Request):
-    return await req_handler.handle(req)
+    if not inflight.accepting:
+        # Slack retries events elsewhere; nothing new gets started here
+        return Response(status_code=503, headers={"Retry-After": "5"})
+    # Slack redelivers (with X-Slack-Retry-Num) whenever we're slow to answer, so
+    # drop anything we've already accepted before Bolt runs a handler for it again.
+    body = await req.body()
+    if signature_verifier.is_valid_request(body, req.headers):  # type: ignore[arg-type]
+        key = delivery_key(body, req.headers.get("content-type", ""))
+        if key and deliveries.check(key):
+            logger.debug(
+                "Dropping duplicate Slack delivery %s (retry %s)",
+                key,
+                req.headers.get("x-slack-retry-num"),
+            )
+            return Response(status_code=200, headers={"X-Slack-No-Retry": "1"})
+    # Bolt runs listeners in tasks created under this span, so they join its trace.
+    with tracer.span("slack.request", path=req.url.path):
+        return await req_handler.handle(req)
 
 
 async def health(req: Request):
@@ -36,46 +97,264 @@ async def health(req: Request):
     except Exception:
         slack_healthy = False
 
+    breaker = env.home_breaker.snapshot()
     return JSONResponse(
         {
-            "healthy": slack_healthy,
+            "healthy": slack_healthy and not env.stopping,
+            "stopping": env.stopping,
             "slack": slack_healthy,
+            "slack_transport": await transport_stats(env.transport),
+            "home_assistant": {
+                "available": breaker["state"] == "closed",
+                "stale_since": cache.stale_since,
+                "breaker": breaker,
+            },
+            "database": env.db.stats(),
+            "websockets": env.sockets.stats(),
+            "in_flight": len(inflight),
+        },
+        # let load balancers move traffic away while we drain
+        status_code=503 if env.stopping else 200,
+    )
+
+
+def api_auth(req: Request) -> Response | None:
+    """The error response for an unauthenticated /api request, or None."""
+    if not config.api_token:
+        return JSONResponse({"error": "not_found"}, status_code=404)
+    given = req.headers.get("authorization", "")
+    if not hmac.compare_digest(given.encode(), f"Bearer {config.api_token}".encode()):
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    return None
+
+
+def _too_large(limit: int) -> Response:
+    return JSONResponse({"error": "body_too_large", "max": limit}, status_code=413)
+
+
+async def read_json(req: Request) -> tuple[Any, Response | None]:
+    """The parsed request body, or the error response for one that's too big
+    (judged from Content-Length before reading anything, then while reading
+    in case it lied or was absent) or isn't JSON."""
+    limit = config.limits.body_size
+    length = req.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        return None, _too_large(limit)
+    body = bytearray()
+    async for chunk in req.stream():
+        body += chunk
+        if len(body) > limit:
+            return None, _too_large(limit)
+    try:
+        check_json(body.decode(), limit, config.limits.json_depth)
+        return json.loads(body), None
+    except ValueError:
+        return None, JSONResponse({"error": "invalid_json"}, status_code=400)
+
+
+async def audit_endpoint(req: Request):
+    if (denied := api_auth(req)) is not None:
+        return denied
+    try:
+        limit = min(max(int(req.query_params.get("limit", 50)), 1), 200)
+        before = req.query_params.get("before")
+        before = int(before) if before is not None else None
+    except ValueError:
+        return JSONResponse({"error": "invalid_cursor"}, status_code=400)
+
+    rows, cursor = await audit_history(
+        limit=limit,
+        before=before,
+        performer=req.query_params.get("performer"),
+        entity=req.query_params.get("entity"),
+    )
+    return JSONResponse({"items": rows, "next": cursor})
+
+
+async def run_operation(op: Any) -> dict[str, Any]:
+    """One /api/ha operation, validated and audited like `/transcental ha`."""
+    if not (
+        isinstance(op, dict)
+        and isinstance(op.get("entity"), str)
+        and isinstance(op.get("action"), str)
+    ):
+        return {"ok": False, "message": "Operations need `entity` and `action`."}
+    value = op.get("value")
+    if value is not None and not isinstance(value, (str, int, float)):
+        return {"ok": False, "message": "`value` must be a string or a number."}
+    value = str(value) if value is not None else None
+
+    started = perf_counter()
+    result = await perform_action(op["entity"], op["action"], value)
+    env.audit.record(
+        performer="api",
+        command="ha",
+        latency=perf_counter() - started,
+        ok=result.ok,
+        entity=op["entity"],
+        action=op["action"],
+        value=value,
+        result=result.message,
+    )
+    return {"ok": result.ok, "message": result.message}
+
+
+async def announce(heartbeat: str, messages: list[str] | None = None):
+    """Best-effort heartbeat for API actions: by now the action has happened,
+    so a Slack failure mustn't turn the response into an error the client
+    would retry."""
+    try:
+        await send_heartbeat(
+            heartbeat, messages=messages, channel=config.slack.whitelist_channel
+        )
+    except Exception:
+        logger.warning("Could not send API heartbeat", exc_info=True)
+
+
+async def ha_endpoint(req: Request):
+    if (denied := api_auth(req)) is not None:
+        return denied
+    if not inflight.accepting:
+        return JSONResponse(SHUTTING_DOWN, status_code=503)
+    op, error = await read_json(req)
+    if error is not None:
+        return error
+
+    with tracer.span("api.ha"):
+        result = await run_operation(op)
+    if result["ok"]:
+        await announce(f"API: {result['message']}")
+    return JSONResponse(result, status_code=200 if result["ok"] else 422)
+
+
+async def ha_batch_endpoint(req: Request):
+    """Runs every operation concurrently; results come back in request order."""
+    if (denied := api_auth(req)) is not None:
+        return denied
+    if not inflight.accepting:
+        return JSONResponse(SHUTTING_DOWN, status_code=503)
+    body, error = await read_json(req)
+    if error is not None:
+        return error
+    ops = body.get("operations") if isinstance(body, dict) else None
+    if not isinstance(ops, list) or not ops:
+        return JSONResponse({"error": "invalid_operations"}, status_code=400)
+    if len(ops) > MAX_BATCH:
+        return JSONResponse(
+            {"error": "too_many_operations", "max": MAX_BATCH}, status_code=413
+        )
+
+    with tracer.span("api.ha_batch", operations=len(ops)):
+        results = await asyncio.gather(*(run_operation(op) for op in ops))
+    if done := [result["message"] for result in results if result["ok"]]:
+        # one heartbeat per batch, with the operations threaded under it
+        await announce(f"API: performed {len(done)} of {len(ops)} operations", done)
+    return JSONResponse({"results": results})
+
+
+@lru_cache(maxsize=16)
+def state_body(version: int, entity_id: str | None, public: bool) -> bytes:
+    # the cache only changes along with its version, so render once per version
+    snapshot = cache.snapshot(public=public)
+    if entity_id is None:
+        return json.dumps(snapshot).encode()
+    return json.dumps(
+        {
+            "entity_id": entity_id,
+            "version": snapshot["version"],
+            "state": snapshot["entities"].get(entity_id),
+            "status": snapshot["status"],
         }
+    ).encode()
+
+
+async def state_endpoint(req: Request):
+    """Current state straight from the cache.
+
+    Responses carry the state version as their ETag, so a repeat request with
+    `If-None-Match` gets a bodiless 304. Adding `?wait=N` turns that 304 into
+    a long-poll: the request is held for up to N seconds (at most MAX_WAIT)
+    and answered as soon as the version moves on.
+
+    The light and `home_assistant.public` entities are open to anyone; other
+    mirrored entities, and the full snapshot, need the API token.
+    """
+    entity_id = req.path_params.get("entity_id")
+    if entity_id is not None and entity_id not in config.home_assistant.mirrored:
+        return JSONResponse({"error": "unknown_entity"}, status_code=404)
+    if entity_id is None:
+        public = "authorization" not in req.headers
+    else:
+        public = entity_id in config.home_assistant.shown
+    if not public and (denied := api_auth(req)) is not None:
+        return denied
+    try:
+        wait = min(max(float(req.query_params.get("wait", 0)), 0.0), MAX_WAIT)
+    except ValueError:
+        return JSONResponse({"error": "invalid_wait"}, status_code=400)
+
+    version = cache.version
+    if etag_matches(req, f'"{version}"') and wait:
+        if env.sockets.full:
+            return Response(status_code=503, headers={"Retry-After": "5"})
+        await env.sockets.wait(version, wait)
+        version = cache.version
+
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(req, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        state_body(version, entity_id, public),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+async def loop_endpoint(req: Request):
+    if (denied := api_auth(req)) is not None:
+        return denied
+    return JSONResponse(monitor.stats())
+
+
+async def events_endpoint(req: Request):
+    # For clients that can't hold a websocket open (kiosks, strict proxies).
+    if env.sockets.full:
+        return Response(status_code=503, headers={"Retry-After": "5"})
+    last_event_id = req.headers.get("last-event-id") or req.query_params.get(
+        "last_event_id"
+    )
+    return StreamingResponse(
+        env.sockets.events(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    try:
-        while True:
-            data = {
-                "light": {
-                    "colour": cache.light_colour,
-                    "on": cache.light_on,
-                    "brightness": cache.light_brightness,
-                    "temperature": cache.light_temperature,
-                }
-            }
-            await websocket.send_json(data)
-            payload = await env.update_queue.get()
-            if payload != "light_update":
-                continue
-    except WebSocketDisconnect:
-        return
-
-
-async def index(req: Request):
-    return templates.TemplateResponse(req, "index.html")
+    await env.sockets.serve(websocket)
 
 
 app = Starlette(
     debug=True if config.environment != "production" else False,
     routes=[
-        Route(path="/", endpoint=index, methods=["GET"]),
+        Route(path="/", endpoint=index_page.serve, methods=["GET", "HEAD"]),
         WebSocketRoute(path="/ws", endpoint=websocket_endpoint),
+        Route(path="/events", endpoint=events_endpoint, methods=["GET"]),
         Route(path="/slack/events", endpoint=endpoint, methods=["POST"]),
         Route(path="/health", endpoint=health, methods=["GET"]),
-        Mount("/static", app=StaticFiles(directory=STATIC_DIR), name="static"),
+        Route(path="/api/audit", endpoint=audit_endpoint, methods=["GET"]),
+        Route(path="/api/ha", endpoint=ha_endpoint, methods=["POST"]),
+        Route(path="/api/loop", endpoint=loop_endpoint, methods=["GET"]),
+        Route(path="/api/ha/batch", endpoint=ha_batch_endpoint, methods=["POST"]),
+        Route(path="/api/state", endpoint=state_endpoint, methods=["GET"]),
+        Route(path="/api/state/{entity_id}", endpoint=state_endpoint, methods=["GET"]),
+        Route(
+            path="/static/{path:path}",
+            endpoint=static_assets.serve,
+            methods=["GET", "HEAD"],
+            name="static",
+        ),
     ],
     lifespan=env.enter,
 )
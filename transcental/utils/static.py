@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from time import monotonic
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.templating import Jinja2Templates
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# already compressed, not worth spending startup time on
+INCOMPRESSIBLE = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".woff2", ".gz"}
+
+
+def etag_matches(req: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already covers `etag`."""
+    if_none_match = req.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+@dataclass
+class Variant:
+    body: bytes
+    etag: str
+
+
+@dataclass
+class Asset:
+    media_type: str
+    variants: dict[str, Variant] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str, compress: bool = True) -> "Asset":
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        asset = cls(media_type=media_type)
+        asset.variants["identity"] = Variant(body, f'"{digest}"')
+        if not compress:
+            return asset
+        encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            encoded["br"] = brotli.compress(body, quality=11)
+        for encoding, data in encoded.items():
+            if len(data) < len(body):
+                asset.variants[encoding] = Variant(data, f'"{digest}-{encoding}"')
+        return asset
+
+    def pick(self, accept_encoding: str) -> tuple[str, Variant]:
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, _, params = part.strip().partition(";")
+            if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+                continue
+            accepted.add(coding.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and encoding in accepted:
+                return encoding, self.variants[encoding]
+        return "identity", self.variants["identity"]
+
+    def respond(self, req: Request, cache_control: str) -> Response:
+        encoding, variant = self.pick(req.headers.get("accept-encoding", ""))
+        headers = {
+            "Cache-Control": cache_control,
+            "ETag": variant.etag,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(req, variant.etag):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(variant.body, media_type=self.media_type, headers=headers)
+
+
+class StaticAssets:
+    """Static files fingerprinted and precompressed once at startup.
+
+    Each file is served under its own name (revalidated via ETag) and under a
+    content-hashed name like `light.3f2a9c.svg`, which is cached forever. Use
+    `url()` (exposed to templates as `static_url`) to link to the latter.
+    """
+
+    def __init__(self, directory: Path, prefix: str = "/static"):
+        self.directory = directory
+        self.prefix = prefix
+        self._assets: dict[str, Asset] = {}
+        self._fingerprinted: dict[str, str] = {}
+        self.load()
+
+    def load(self):
+        assets: dict[str, Asset] = {}
+        fingerprinted: dict[str, str] = {}
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file():
+                continue
+            name = path.relative_to(self.directory).as_posix()
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            asset = Asset.build(
+                path.read_bytes(),
+                media_type,
+                compress=path.suffix.lower() not in INCOMPRESSIBLE,
+            )
+            digest = asset.variants["identity"].etag.strip('"')[:10]
+            hashed = path.with_name(f"{path.stem}.{digest}{path.suffix}")
+            hashed_name = hashed.relative_to(self.directory).as_posix()
+            assets[name] = assets[hashed_name] = asset
+            fingerprinted[name] = hashed_name
+        self._assets = assets
+        self._fingerprinted = fingerprinted
+        logger.debug("Loaded %d static assets", len(fingerprinted))
+
+    def url(self, name: str) -> str:
+        return f"{self.prefix}/{self._fingerprinted.get(name, name)}"
+
+    async def serve(self, req: Request) -> Response:
+        name = req.path_params["path"]
+        asset = self._assets.get(name)
+        if asset is None:
+            return Response("Not Found", status_code=404)
+        # original names may change content between deploys; hashed ones can't
+        if name in self._fingerprinted:
+            return asset.respond(req, REVALIDATE)
+        return asset.respond(req, IMMUTABLE)
+
+
+class CachedTemplate:
+    """A context-free template rendered once and kept in memory.
+
+    With `watch` set (development), the template directory is re-checked at
+    most once every CHECK_INTERVAL seconds and the page re-rendered if a
+    template file has changed. Otherwise it is rendered once per process.
+    """
+
+    CHECK_INTERVAL = 1.0
+
+    def __init__(
+        self, templates: Jinja2Templates, name: str, directory: Path, watch: bool
+    ):
+        self.templates = templates
+        self.name = name
+        self.directory = directory
+        self.watch = watch
+        self._signature: tuple | None = None
+        self._checked = 0.0
+        self._asset: Asset | None = None
+
+    def _current_signature(self) -> tuple:
+        return tuple(
+            (path.name, path.stat().st_mtime_ns)
+            for path in sorted(self.directory.rglob("*.html"))
+        )
+
+    async def serve(self, req: Request) -> Response:
+        if self._asset is None or (
+            self.watch and monotonic() - self._checked >= self.CHECK_INTERVAL
+        ):
+            self._checked = monotonic()
+            signature = self._current_signature() if self.watch else None
+            if self._asset is None or signature != self._signature:
+                body = self.templates.get_template(self.name).render().encode()
+                self._asset = Asset.build(body, "text/html; charset=utf-8")
+                self._signature = signature
+        return self._asset.respond(req, REVALIDATE)
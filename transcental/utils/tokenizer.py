@@ -0,0 +1,99 @@
+import codecs
+import re
+import shlex
+from dataclasses import dataclass
+
+# One shell-style word: runs of plain characters, backslash escapes and
+# single/double quoted sections, all glued together (`a"b c"d` is one word).
+_WORD_RE = re.compile(r"""(?:[^ \t\r\n'"\\]+|\\.|'[^']*'|"(?:[^"\\]|\\.)*")+""", re.S)
+_SPACE_RE = re.compile(r"[ \t\r\n]*")
+_PIECE_RE = re.compile(r"""\\(.)|'([^']*)'|"((?:[^"\\]|\\.)*)"|([^'"\\]+)""", re.S)
+# inside double quotes only \" and \\ are escapes; other backslashes are kept
+_DQ_ESCAPE_RE = re.compile(r"""\\(["\\])""")
+
+# Slack's angle-bracket forms, e.g. <@U123|name>, <#C123|name>, <mailto:a@b.c|a@b.c>
+_ANGLE_RE = re.compile(
+    r"<(?:@(?P<user>[UW][A-Z0-9]+)|#(?P<channel>[CG][A-Z0-9]+)"
+    r"|(?i:mailto):(?P<mailto>[^|>]+))(?:\|[^>]+)?>"
+)
+USER_ID_RE = re.compile(r"[UW][A-Z0-9]+")
+CHANNEL_ID_RE = re.compile(r"[CG][A-Z0-9]+")
+
+# The escapes `unicode_escape` understands, so decoding can leave everything
+# else (notably non-ASCII text) untouched.
+_ESCAPE_RE = re.compile(
+    r"\\(?:[\\'\"abfnrtv]|[0-7]{1,3}|x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}"
+    r"|U[0-9a-fA-F]{8}|N\{[^}]+\})"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Token:
+    text: str  # the word with quotes and escapes resolved, as shlex would give it
+    kind: str = "word"  # "word", "quoted", "user", "channel" or "mailto"
+    value: str | None = None  # the user/channel id or email for angle forms
+
+
+def _unquote(raw: str) -> str:
+    parts = []
+    for escaped, single, double, plain in _PIECE_RE.findall(raw):
+        if plain:
+            parts.append(plain)
+        elif single or double:
+            parts.append(single or _DQ_ESCAPE_RE.sub(r"\1", double))
+        else:
+            parts.append(escaped)
+    return "".join(parts)
+
+
+def classify(text: str, quoted: bool = False) -> Token:
+    """Recognise Slack's angle-bracket mention, channel and mailto forms."""
+    if "<" in text and (m := _ANGLE_RE.fullmatch(text.strip())):
+        kind = m.lastgroup
+        value = m.group(kind)
+        return Token(text, kind, value.strip() if kind == "mailto" else value)
+    return Token(text, "quoted" if quoted else "word")
+
+
+def tokenize(text: str, max_tokens: int | None = None) -> list[Token]:
+    """Split slash-command text the way `shlex.split(text, posix=True)` does,
+    classifying Slack mentions, channels and mailto links on the way.
+
+    Raises ValueError, as shlex does, on unbalanced quotes or a trailing
+    backslash, and as soon as there are more than `max_tokens` words.
+    """
+    tokens: list[Token] = []
+    pos = _SPACE_RE.match(text).end()
+    end = len(text)
+    while pos < end:
+        if max_tokens is not None and len(tokens) >= max_tokens:
+            raise ValueError(f"too many words (the limit is {max_tokens})")
+        m = _WORD_RE.match(text, pos)
+        stop = m.end() if m else pos
+        if stop < end and text[stop] not in " \t\r\n":
+            # unbalanced quote or trailing backslash; rare enough to let shlex
+            # work out exactly which, so the error messages stay the same
+            shlex.split(text, posix=True)
+            raise ValueError("No closing quotation")
+        raw = m.group()
+        if "\\" in raw or "'" in raw or '"' in raw:
+            tokens.append(classify(_unquote(raw), quoted="'" in raw or '"' in raw))
+        else:
+            tokens.append(classify(raw, quoted=False))
+        pos = _SPACE_RE.match(text, stop).end()
+    return tokens
+
+
+def decode_escapes(text: str) -> str:
+    """Resolve Python-style escapes (`\\n`, `\\u00e9`, ...) in user text."""
+    if "\\" not in text:
+        return text
+    return _ESCAPE_RE.sub(_decode_escape, text)
+
+
+def _decode_escape(m: re.Match) -> str:
+    try:
+        return codecs.decode(m.group(), "unicode_escape")
+    except UnicodeDecodeError:
+        # well-formed but meaningless, e.g. \N{nope} or \UFFFFFFFF: keep as typed
+        return m.group()
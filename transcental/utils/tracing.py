@@ -0,0 +1,243 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import random
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from time import time_ns
+from typing import Any
+from typing import Iterator
+
+from aiohttp import ClientSession
+
+from transcental.config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: int  # unix ns
+    end: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def context(self) -> dict[str, str]:
+        """The bit that crosses process/thread boundaries."""
+        return {"trace_id": self.trace_id, "span_id": self.span_id}
+
+
+# Marks "inside a trace that was sampled out", so children skip cheaply too.
+_UNSAMPLED = object()
+_current: contextvars.ContextVar[Any] = contextvars.ContextVar("span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Tracer:
+    """Minimal span tracer with trace ids carried in a contextvar.
+
+    Roots are sampled at `sample` (0 disables tracing entirely). Finished
+    spans are buffered and written out by `flush()`, which `run()` calls
+    periodically, to a JSON-lines file or an OTLP/HTTP JSON collector.
+
+    Hops that leave the process (an HA service call whose echo comes back on
+    the HA thread, or a snapshot sent over the state bus) are stitched
+    together with `expect()`/`resume()` and explicit `parent=` contexts.
+    """
+
+    def __init__(self):
+        self._buffer: list[Span] = []
+        self._expected: dict[str, tuple[dict[str, str], int]] = {}
+        self._session: ClientSession | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return config.tracing.sample > 0
+
+    @contextlib.contextmanager
+    def span(
+        self, name: str, parent: dict[str, str] | None = None, **attributes: Any
+    ) -> Iterator[Span | None]:
+        current = _current.get()
+        if not self.enabled or (parent is None and current is _UNSAMPLED):
+            yield None
+            return
+        if parent is None and current is None:
+            if random.random() >= config.tracing.sample:
+                token = _current.set(_UNSAMPLED)
+                try:
+                    yield None
+                finally:
+                    _current.reset(token)
+                return
+            parent_ctx = None
+        else:
+            parent_ctx = parent or current.context
+
+        span = Span(
+            name=name,
+            trace_id=parent_ctx["trace_id"] if parent_ctx else _new_id(128),
+            span_id=_new_id(64),
+            parent_id=parent_ctx["span_id"] if parent_ctx else None,
+            start=time_ns(),
+            attributes=attributes,
+        )
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = repr(exc)
+            raise
+        finally:
+            _current.reset(token)
+            span.end = time_ns()
+            self._record(span)
+
+    def current(self) -> dict[str, str] | None:
+        current = _current.get()
+        return current.context if isinstance(current, Span) else None
+
+    def expect(self, key: str):
+        """Remember the current span so a later, unrelated callback for `key`
+        (e.g. the HA state_changed echo for an entity) can join its trace."""
+        if (ctx := self.current()) is not None:
+            if len(self._expected) > 1024:
+                self._expected.clear()
+            self._expected[key] = (ctx, time_ns())
+
+    def resume(self, key: str, name: str) -> dict[str, str] | None:
+        """Close the gap opened by `expect(key)` as span `name`, returning its
+        context to parent whatever happens next."""
+        expected = self._expected.pop(key, None)
+        if expected is None:
+            return None
+        parent, start = expected
+        span = Span(
+            name=name,
+            trace_id=parent["trace_id"],
+            span_id=_new_id(64),
+            parent_id=parent["span_id"],
+            start=start,
+            end=time_ns(),
+            attributes={"key": key},
+        )
+        self._record(span)
+        return span.context
+
+    def _record(self, span: Span):
+        if len(self._buffer) < config.tracing.max_buffer:
+            self._buffer.append(span)
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        spans, self._buffer = self._buffer, []
+        try:
+            if config.tracing.exporter == "otlp":
+                await self._export_otlp(spans)
+            else:
+                await asyncio.to_thread(self._export_file, spans)
+        except Exception:
+            logger.warning("Failed to export %d spans", len(spans), exc_info=True)
+
+    def _export_file(self, spans: list[Span]):
+        with open(config.tracing.path, "a") as f:
+            for span in spans:
+                f.write(json.dumps(asdict(span), default=str) + "\n")
+
+    async def _export_otlp(self, spans: list[Span]):
+        def value(v: Any) -> dict[str, Any]:
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        def otlp(span: Span) -> dict[str, Any]:
+            data = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start),
+                "endTimeUnixNano": str(span.end),
+                "attributes": [
+                    {"key": k, "value": value(v)} for k, v in span.attributes.items()
+                ],
+                "status": {"code": 2, "message": span.error} if span.error else {},
+            }
+            if span.parent_id:
+                data["parentSpanId"] = span.parent_id
+            return data
+
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": "transcental"},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "transcental"},
+                            "spans": [otlp(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        if self._session is None:
+            self._session = ClientSession()
+        async with self._session.post(config.tracing.otlp_endpoint, json=body) as resp:
+            resp.raise_for_status()
+
+    async def run(self):
+        """Flush periodically until cancelled, then flush what's left."""
+        try:
+            while True:
+                await asyncio.sleep(config.tracing.flush_interval)
+                await self.flush()
+        finally:
+            await self.flush()
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+
+tracer = Tracer()
+
+
+def traced(name: str):
+    """Wrap an async function (e.g. a Bolt listener) in a span.
+
+    Bolt injects listener arguments by name; `functools.wraps` keeps the
+    wrapped signature visible to it.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from typing import Any
+
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+from slack_bolt.async_app import AsyncApp
+
+from transcental.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class SocketModePool:
+    """Several Socket Mode connections for the same app.
+
+    Slack spreads events across every open connection for an app, so while
+    one is reconnecting (which Slack asks for every few hours) the others
+    keep receiving, and nothing is lost in the gap.
+    """
+
+    # how long start() waits for connections before leaving them to finish in
+    # the background
+    CONNECT_TIMEOUT = 10.0
+
+    def __init__(self, app: AsyncApp, app_token: str, connections: int):
+        self.handlers = [
+            AsyncSocketModeHandler(app, app_token) for _ in range(connections)
+        ]
+        self._connecting: set[asyncio.Task] = set()
+
+    async def start(self):
+        # The client's connect() never raises: it logs and retries until it
+        # gets through. So rather than wait on a bad token or an unreachable
+        # Slack forever, give up waiting after CONNECT_TIMEOUT and let the
+        # stragglers carry on retrying.
+        tasks = {
+            asyncio.create_task(handler.connect_async()) for handler in self.handlers
+        }
+        _, pending = await asyncio.wait(tasks, timeout=self.CONNECT_TIMEOUT)
+        if pending:
+            logger.warning(
+                "%d of %d Socket Mode connections still connecting after %.0fs",
+                len(pending),
+                len(tasks),
+                self.CONNECT_TIMEOUT,
+            )
+            self._connecting = pending
+            for task in pending:
+                task.add_done_callback(self._connecting.discard)
+
+    async def connected(self) -> int:
+        states = await asyncio.gather(
+            *(handler.client.is_connected() for handler in self.handlers)
+        )
+        return sum(states)
+
+    async def close(self):
+        for task in list(self._connecting):
+            task.cancel()
+        await asyncio.gather(
+            *(handler.close_async() for handler in self.handlers),
+            return_exceptions=True,
+        )
+
+
+async def start_transport(app: AsyncApp) -> SocketModePool | None:
+    """Open Socket Mode connections if configured; in HTTP mode Slack posts
+    to /slack/events and there is nothing to start."""
+    if not config.slack.socket_mode:
+        logger.info("Slack transport: HTTP (events at /slack/events)")
+        return None
+
+    if config.environment == "production":
+        logger.warning(
+            "You are currently running Socket mode in production. This is NOT RECOMMENDED - you should set up a proper HTTP server with a request URL."
+        )
+    pool = SocketModePool(app, config.slack.app_token, config.slack.socket_connections)
+    await pool.start()
+    logger.info(
+        "Slack transport: Socket Mode, %d/%d connections live",
+        await pool.connected(),
+        len(pool.handlers),
+    )
+    return pool
+
+
+async def transport_stats(pool: SocketModePool | None) -> dict[str, Any]:
+    if pool is None:
+        return {"transport": "http"}
+    return {
+        "transport": "socket",
+        "connections": len(pool.handlers),
+        "connected": await pool.connected(),
+    }
@@ -1,5 +1,6 @@
 from slack_bolt.async_app import AsyncApp
 
+from transcental.utils.shutdown import inflight
 from transcental.views.hello_world import hello_world_handler
 
 
@@ -13,4 +14,4 @@ VIEWS = [
 
 def register_views(app: AsyncApp):
     for view in VIEWS:
-        app.view(view["id"])(view["handler"])
+        app.view(view["id"])(inflight.track(view["handler"]))
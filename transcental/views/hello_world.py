@@ -5,9 +5,11 @@ from blockkit import Section
 from slack_bolt.async_app import AsyncAck
 from slack_sdk.web.async_client import AsyncWebClient
 
+from transcental.utils.blocks import BlockTemplate
 
-async def get_hello_world_view(channel_id: str):
-    modal = (
+
+HELLO_WORLD_VIEW = BlockTemplate(
+    lambda channel_id: (
         Modal()
         .callback_id("hello_world")
         .title("Hewwo Wowld")
@@ -20,8 +22,13 @@ async def get_hello_world_view(channel_id: str):
         .private_metadata(channel_id)
         .submit("Submit")
         .build()
-    )
-    return modal
+    ),
+    "channel_id",
+)
+
+
+async def get_hello_world_view(channel_id: str):
+    return HELLO_WORLD_VIEW.render(channel_id=channel_id)
 
 
 async def hello_world_handler(ack: AsyncAck, client: AsyncWebClient, body: dict):